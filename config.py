@@ -6,7 +6,7 @@ and exposes a `Config` class with typed attributes and helpers.
 Features:
 - Supports DATABASE_URL override (useful for deployed environments).
 - Builds a PostgreSQL URL from components and URL-encodes credentials.
-- Safe parsing for integers and lists (DB_PORT, ADMINS).
+- Safe parsing for integers and lists (DB_PORT, DB_POOL_*, ADMINS).
 - Explicit `.env` path loading to avoid surprises when running from other CWDs.
 """
 
@@ -26,6 +26,14 @@ BASE_DIR = Path(__file__).resolve().parent
 load_dotenv(BASE_DIR / ".env")
 
 
+def _env_int(name: str, default: int) -> int:
+    """Read an integer env var, falling back to `default` when unset or malformed."""
+    try:
+        return int(os.getenv(name, "") or default)
+    except (TypeError, ValueError):
+        return default
+
+
 class Config:
     # Public settings
     URL: str = os.getenv("URL", "http://localhost:8000")
@@ -50,6 +58,13 @@ class Config:
     # accept either DB_NAME or DB_DATABASE
     DB_NAME: str = os.getenv("DB_NAME", os.getenv("DB_DATABASE", os.getenv("POSTGRES_DATABASE", "database")))
 
+    # Connection pool sizing (per worker process); small defaults keep several workers
+    # within a hosted Postgres connection limit, raise them via DB_POOL_* when the server allows
+    DB_POOL_SIZE: int = _env_int("DB_POOL_SIZE", 5)
+    DB_MAX_OVERFLOW: int = _env_int("DB_MAX_OVERFLOW", 10)
+    DB_POOL_TIMEOUT: int = _env_int("DB_POOL_TIMEOUT", 30)
+    DB_POOL_RECYCLE: int = _env_int("DB_POOL_RECYCLE", 1800)
+
     # optional DB_CONNECTION like 'pgsql' in some .env files — map to SQLAlchemy scheme
     DB_CONNECTION: str = os.getenv("DB_CONNECTION", os.getenv("DB_DRIVER", ""))
 
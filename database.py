@@ -5,12 +5,15 @@ from sqlalchemy.orm import sessionmaker
 
 DATABASE_URL = Config.get_database_url()
 
-# Use pre_ping to avoid stale connections on cloud providers; allow larger pool
+# Use pre_ping to avoid stale connections on cloud providers / PgBouncer; size the
+# pool for concurrent requests and recycle connections before idle timeouts hit
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+    pool_size=Config.DB_POOL_SIZE,
+    max_overflow=Config.DB_MAX_OVERFLOW,
+    pool_timeout=Config.DB_POOL_TIMEOUT,
+    pool_recycle=Config.DB_POOL_RECYCLE,
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -1,30 +1,26 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from pathlib import Path
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from models import User, TripMember, Trip
 from database import Base, engine
 from config import Config
+from templating import HOME_PAGE, PRIVACY_PAGE
 from bot import bot
 from routers.webhook import router as webhook_router
 from routers.auth import router as auth_router
 from routers.webapp import router as webapp_router
 from routers.trips import router as trips_router
 from routers.admin import router as admin_router
-import requests
 import logging
 from sqlalchemy.exc import OperationalError
 import json
 from utils.logging_config import setup_logging
+from utils.http_client import http_client, close_http_client
 
 
 setup_logging()
 # Disable public API docs endpoints for security (/docs, /redoc, /openapi.json)
-app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
+app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None, default_response_class=ORJSONResponse)
 
-# Setup Jinja2 templates for public pages
-BASE_DIR = Path(__file__).resolve().parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 # include routers so endpoints are available
 app.include_router(webhook_router)
@@ -69,7 +65,7 @@ async def initialize_bot():
 		url = f"https://api.telegram.org/bot{Config.BOT_TOKEN}/setWebhook"
 		payload = {"url": f"{Config.URL}/webhook/{Config.BOT_TOKEN}"}
 		try:
-			resp = requests.post(url, json=payload, timeout=10)
+			resp = await http_client.post(url, json=payload)
 			logging.info("Set webhook response: %s", resp.text)
 			results["webhook"] = "success"
 		except Exception as e:
@@ -88,7 +84,7 @@ async def initialize_bot():
 				{"command": "admin", "description": "Open admin tools"},
 			]
 			cmd_url = f"https://api.telegram.org/bot{Config.BOT_TOKEN}/setMyCommands"
-			resp2 = requests.post(cmd_url, json={"commands": commands}, timeout=10)
+			resp2 = await http_client.post(cmd_url, json={"commands": commands})
 			logging.info("Set commands response: %s", resp2.text)
 			results["commands"] = "success"
 		except Exception as e:
@@ -109,7 +105,7 @@ async def home_page(request: Request):
 	Required for Google Cloud Console app publication.
 	"""
 	logging.info("public.home render")
-	return templates.TemplateResponse("home.html", {"request": request})
+	return HOME_PAGE.response(request)
 
 
 @app.get("/privacy", response_class=HTMLResponse)
@@ -120,7 +116,7 @@ async def privacy_policy(request: Request):
 	Required for Google Cloud Console app publication.
 	"""
 	logging.info("public.privacy render")
-	return templates.TemplateResponse("privacy.html", {"request": request})
+	return PRIVACY_PAGE.response(request)
 
 
 @app.get("/")
@@ -154,3 +150,9 @@ async def root():
 async def startup():
 	"""Run initialization on application startup."""
 	await initialize_bot()
+
+
+@app.on_event('shutdown')
+async def shutdown():
+	"""Release pooled outbound HTTP connections on application shutdown."""
+	await close_http_client()
@@ -21,6 +21,7 @@ class TripMember(Base):
     # Composite indexes for common queries and constraints
     __table_args__ = (
         Index('ix_trip_payment_status', 'trip_id', 'payment_status'),  # For seat counting
+        Index('ix_trip_joined', 'trip_id', 'joined_at'),  # For admin member lists ordered by join date
         Index('ix_user_payment_status', 'user_id', 'payment_status'),  # For finding unpaid members
         Index('ix_user_joined', 'user_id', 'joined_at'),  # For finding recent registrations
         UniqueConstraint('user_id', 'trip_id', name='uq_user_trip'),  # Prevent duplicate registrations
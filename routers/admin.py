@@ -1,24 +1,85 @@
-from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse
-from fastapi.templating import Jinja2Templates
-from pathlib import Path
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from io import BytesIO
+from fastapi import APIRouter, Request, HTTPException, Depends
+from fastapi.responses import ORJSONResponse, StreamingResponse, Response
+from sqlalchemy.orm import Session, load_only
+from starlette.background import BackgroundTask
+from sqlalchemy import case, func, select, update
+from tempfile import SpooledTemporaryFile
 from datetime import datetime
+from collections import Counter
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.utils import get_column_letter
+import asyncio
+import io
 
 from database import get_db
 from config import Config
+from templating import templates
 from models.Trip import Trip, TripStatus
 from models.TripMember import TripMember, PaymentStatus
+from models.User import User
+from bot import bot as tg_bot
 from webapp_security import require_telegram_webapp
+from routers.trips import dashboard_cache, invalidate_dashboard_cache, invalidate_trip_cache
+from utils.http_cache import etag_response, make_etag
 
 import logging
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
-BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+
+_BOT_USERNAME = Config.BOT_USERNAME
+_ADMINS: frozenset[int] = frozenset(Config.ADMINS or ())
+_ADMINS_LIST = list(_ADMINS)
+
+_MAX_TRIPS_PER_PAGE = 200
+
+
+
+_STATUS_EMOJI = {
+    PaymentStatus.not_paid: '❌',
+    PaymentStatus.half_paid: '🟡',
+    PaymentStatus.full_paid: '✅'
+}
+_STATUS_TEXT = {
+    PaymentStatus.not_paid: 'Not Paid',
+    PaymentStatus.half_paid: 'Half Paid (50%)',
+    PaymentStatus.full_paid: 'Full Paid (100%)'
+}
+
+
+# Excel export styles; openpyxl style objects are immutable, so every export shares them
+def _solid_fill(color: str) -> PatternFill:
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+_XLSX_HEADER_FILL = _solid_fill("4F46E5")
+_XLSX_HEADER_FONT = Font(bold=True, color="FFFFFF", size=12)
+_XLSX_TITLE_FONT = Font(bold=True, size=16, color="1F2937")
+_XLSX_TITLE_FILL = _solid_fill("F3F4F6")
+_XLSX_INFO_FONT = Font(size=10, color="6B7280")
+_XLSX_SUMMARY_FONT = Font(bold=True, size=11)
+_XLSX_SUMMARY_FILL = _solid_fill("E5E7EB")
+_XLSX_BOLD_FONT = Font(bold=True)
+_XLSX_LEFT_ALIGN = Alignment(horizontal="left", vertical="center")
+_XLSX_CENTER_ALIGN = Alignment(horizontal="center", vertical="center")
+_XLSX_BORDER = Border(
+    left=Side(style='thin', color='D1D5DB'),
+    right=Side(style='thin', color='D1D5DB'),
+    top=Side(style='thin', color='D1D5DB'),
+    bottom=Side(style='thin', color='D1D5DB')
+)
+# Payment status row colors
+_XLSX_STATUS_FILLS = {
+    PaymentStatus.not_paid: _solid_fill("FEE2E2"),      # Red
+    PaymentStatus.half_paid: _solid_fill("FEF3C7"),     # Yellow
+    PaymentStatus.full_paid: _solid_fill("D1FAE5"),     # Green
+}
+_XLSX_DEFAULT_FILL = _solid_fill("FFFFFF")
+_XLSX_STATUS_LABELS = {
+    status: status.value.replace('_', ' ').title() for status in PaymentStatus
+}
 
 
 def _require_admin(request: Request) -> int:
@@ -30,683 +91,682 @@ def _require_admin(request: Request) -> int:
         tg_id = int(request.headers.get("X-Telegram-Id", "0"))
     except Exception:
         tg_id = 0
-    if tg_id not in set(Config.ADMINS or []):
+    if tg_id not in _ADMINS:
         raise HTTPException(status_code=403, detail="Admin access required")
     return tg_id
 
 
+async def _remove_from_group(group_id: int, telegram_id: int) -> None:
+    """Remove a user from a group chat while leaving them free to rejoin.
+
+    unbanChatMember without only_if_banned removes a current member, i.e. the same
+    effect as ban+unban in a single API round trip.
+    """
+    await tg_bot.unban_chat_member(group_id, telegram_id, only_if_banned=False)
+
+
+def _with_etag(request: Request, response: Response) -> Response:
+    """Serve a rendered page with a weak ETag that the browser must always revalidate.
+    Admin pages change in place (edits redirect back to them), so no-cache keeps the
+    empty 304 for unchanged pages without ever showing a stale one.
+    """
+    etag = make_etag(response.body, weak=True)
+    return etag_response(request, response.body, "private, no-cache", etag=etag)
+
+
+def _dashboard_page(db: Session, page: int, per_page: int):
+    """Return (page, total_pages, total_trips, trip_rows) for the admin dashboard.
+
+    Results are cached per (page, per_page) for a few seconds so repeated admin
+    refreshes share one aggregation pass.
+    """
+    key = (page, per_page)
+    cached = dashboard_cache.get(key)
+    if cached:
+        return cached
+
+    total_trips = db.query(func.count(Trip.id)).scalar() or 0
+    total_pages = max((total_trips + per_page - 1) // per_page, 1)
+    page = min(page, total_pages)
+
+    trips = (
+        db.query(Trip)
+        .order_by(Trip.id.desc())
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+        .all()
+    )
+    logging.info("admin.dashboard build trips=%s page=%s total=%s", len(trips), page, total_trips)
+    # One grouped query for all member counts instead of three COUNTs per trip
+    counts = {
+        trip_id: (total, half or 0, full or 0)
+        for trip_id, total, half, full in db.query(
+            TripMember.trip_id,
+            func.count(TripMember.id),
+            func.sum(case((TripMember.payment_status == PaymentStatus.half_paid, 1), else_=0)),
+            func.sum(case((TripMember.payment_status == PaymentStatus.full_paid, 1), else_=0)),
+        ).filter(TripMember.trip_id.in_([t.id for t in trips])).group_by(TripMember.trip_id).all()
+    } if trips else {}
+    trip_rows = []
+    for t in trips:
+        total, half, full = counts.get(t.id, (0, 0, 0))
+        # Half-paid and full-paid both reserve seats
+        paid = half + full
+        seats_available = None if t.participant_limit is None else max(t.participant_limit - paid, 0)
+        trip_rows.append({
+            "id": t.id,
+            "name": t.name,
+            "group_id": t.group_id,
+            "status": t.status.value,
+            "participant_limit": t.participant_limit,
+            "price": t.price if t.price is not None else 0,
+            "registered": total,
+            "half_paid": half,
+            "full_paid": full,
+            "paid": paid,
+            "seats": seats_available,
+        })
+
+    result = (page, total_pages, total_trips, trip_rows)
+    dashboard_cache.set(key, result)
+    return result
+
+
 @router.get("")
-async def admin_home(request: Request):
+async def admin_home(request: Request, page: int = 1, per_page: int = 50, db: Session = Depends(get_db)):
     """Admin dashboard listing trips with quick stats.
     Only accessible from Telegram WebApp for security.
     All mutating API routes are admin-protected via headers.
     """
     # Check if request is from Telegram WebApp
-    error_response = require_telegram_webapp(request, Config.BOT_USERNAME)
+    error_response = require_telegram_webapp(request, _BOT_USERNAME)
     if error_response:
         return error_response
     
-    db_gen = get_db()
-    db: Session = next(db_gen)
-    try:
-        trips = db.query(Trip).order_by(Trip.id.desc()).all()
-        logging.info("admin.dashboard render trips=%s", len(trips))
-        trip_rows = []
-        for t in trips:
-            total = db.query(func.count(TripMember.id)).filter(TripMember.trip_id == t.id).scalar() or 0
-            half = db.query(func.count(TripMember.id)).filter(
-                TripMember.trip_id == t.id, 
-                TripMember.payment_status == PaymentStatus.half_paid
-            ).scalar() or 0
-            full = db.query(func.count(TripMember.id)).filter(
-                TripMember.trip_id == t.id, 
-                TripMember.payment_status == PaymentStatus.full_paid
-            ).scalar() or 0
-            # Half-paid and full-paid both reserve seats
-            paid = half + full
-            seats_available = None if t.participant_limit is None else max(t.participant_limit - paid, 0)
-            trip_rows.append({
-                "id": t.id,
-                "name": t.name,
-                "group_id": t.group_id,
-                "status": t.status.value if hasattr(t.status, 'value') else str(t.status),
-                "participant_limit": t.participant_limit,
-                "price": t.price if t.price is not None else 0,
-                "registered": total,
-                "half_paid": half,
-                "full_paid": full,
-                "paid": paid,
-                "seats": seats_available,
-            })
-
-        return templates.TemplateResponse(
-            "admin_dashboard.html",
-            {
-                "request": request,
-                "admins": Config.ADMINS or [],
-                "trips": trip_rows,
-            }
-        )
-    finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
+    # Paginate so render time stays bounded as trips accumulate
+    per_page = min(max(per_page, 1), _MAX_TRIPS_PER_PAGE)
+    page, total_pages, total_trips, trip_rows = _dashboard_page(db, max(page, 1), per_page)
+
+    return _with_etag(request, templates.TemplateResponse(
+        "admin_dashboard.html",
+        {
+            "request": request,
+            "admins": _ADMINS_LIST,
+            "trips": trip_rows,
+            "page": page,
+            "per_page": per_page,
+            "total_pages": total_pages,
+            "total_trips": total_trips,
+        }
+    ))
 
 
 @router.get("/trip/{trip_id}")
-async def admin_trip_detail(request: Request, trip_id: int):
+async def admin_trip_detail(request: Request, trip_id: int, db: Session = Depends(get_db)):
     """Trip detail page: members and actions.
     Only accessible from Telegram WebApp for security.
     API calls are also protected with admin checks.
     """
     # Check if request is from Telegram WebApp
-    error_response = require_telegram_webapp(request, Config.BOT_USERNAME)
+    error_response = require_telegram_webapp(request, _BOT_USERNAME)
     if error_response:
         return error_response
     
-    db_gen = get_db()
-    db: Session = next(db_gen)
-    try:
-        trip = db.query(Trip).filter(Trip.id == trip_id).first()
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found")
-
-        members = db.query(TripMember).filter(TripMember.trip_id == trip.id).order_by(TripMember.joined_at.desc()).all()
-        member_rows = []
-        
-        # Calculate statistics
-        total_registered = len(members)
-        half_paid_count = 0
-        full_paid_count = 0
-        not_paid_count = 0
-        
-        for m in members:
-            # Count payment statuses
-            if m.payment_status == PaymentStatus.half_paid:
-                half_paid_count += 1
-            elif m.payment_status == PaymentStatus.full_paid:
-                full_paid_count += 1
-            elif m.payment_status == PaymentStatus.not_paid:
-                not_paid_count += 1
-            
-            # Fetch user information
-            from models.User import User
-            user = db.query(User).filter(User.id == m.user_id).first()
-            
-            # Build full name
-            full_name = "Unknown User"
-            telegram_id = None
-            if user:
-                name_parts = []
-                if user.first_name:
-                    name_parts.append(user.first_name)
-                if user.last_name:
-                    name_parts.append(user.last_name)
-                full_name = " ".join(name_parts) if name_parts else user.email.split('@')[0] if user.email else f"User {m.user_id}"
-                telegram_id = user.telegram_id
-            
-            member_rows.append({
-                "id": m.id,
-                "user_id": m.user_id,
-                "full_name": full_name,
-                "telegram_id": telegram_id,
-                "payment_status": m.payment_status.value if hasattr(m.payment_status, 'value') else str(m.payment_status),
-                "receipt": m.payment_receipt_file_id,
-                "joined_at": m.joined_at,
-            })
-        
-        # Calculate total paid (half + full)
-        total_paid = half_paid_count + full_paid_count
-        
-        # Calculate available seats
-        seats_available = None
-        if trip.participant_limit is not None:
-            seats_available = max(trip.participant_limit - total_paid, 0)
-
-        logging.info("admin.trip detail render trip_id=%s members=%s", trip.id, len(member_rows))
-        return templates.TemplateResponse(
-            "admin_trip.html",
-            {
-                "request": request,
-                "admins": Config.ADMINS or [],
-                "trip": trip,
-                "members": member_rows,
-                "stats": {
-                    "registered": total_registered,
-                    "half_paid": half_paid_count,
-                    "full_paid": full_paid_count,
-                    "not_paid": not_paid_count,
-                    "total_paid": total_paid,
-                    "seats_available": seats_available,
-                }
+    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    # Load members with their users in one query instead of one SELECT per member
+    members = (
+        db.query(TripMember, User)
+        .outerjoin(User, User.id == TripMember.user_id)
+        .options(load_only(User.first_name, User.last_name, User.telegram_id, User.email))
+        .filter(TripMember.trip_id == trip.id)
+        .order_by(TripMember.joined_at.desc())
+        .all()
+    )
+    member_rows = []
+    
+    # Calculate statistics
+    total_registered = len(members)
+    half_paid_count = 0
+    full_paid_count = 0
+    not_paid_count = 0
+    
+    for m, user in members:
+        # Count payment statuses
+        if m.payment_status == PaymentStatus.half_paid:
+            half_paid_count += 1
+        elif m.payment_status == PaymentStatus.full_paid:
+            full_paid_count += 1
+        elif m.payment_status == PaymentStatus.not_paid:
+            not_paid_count += 1
+        
+        # Build full name
+        full_name = "Unknown User"
+        telegram_id = None
+        if user:
+            name_parts = []
+            if user.first_name:
+                name_parts.append(user.first_name)
+            if user.last_name:
+                name_parts.append(user.last_name)
+            full_name = " ".join(name_parts) if name_parts else user.email.split('@')[0] if user.email else f"User {m.user_id}"
+            telegram_id = user.telegram_id
+        
+        member_rows.append({
+            "id": m.id,
+            "user_id": m.user_id,
+            "full_name": full_name,
+            "telegram_id": telegram_id,
+            "payment_status": m.payment_status.value,
+            "receipt": m.payment_receipt_file_id,
+            "joined_at": m.joined_at,
+        })
+    
+    # Calculate total paid (half + full)
+    total_paid = half_paid_count + full_paid_count
+    
+    # Calculate available seats
+    seats_available = None
+    if trip.participant_limit is not None:
+        seats_available = max(trip.participant_limit - total_paid, 0)
+
+    logging.info("admin.trip detail render trip_id=%s members=%s", trip.id, len(member_rows))
+    return _with_etag(request, templates.TemplateResponse(
+        "admin_trip.html",
+        {
+            "request": request,
+            "admins": _ADMINS_LIST,
+            "trip": trip,
+            "members": member_rows,
+            "stats": {
+                "registered": total_registered,
+                "half_paid": half_paid_count,
+                "full_paid": full_paid_count,
+                "not_paid": not_paid_count,
+                "total_paid": total_paid,
+                "seats_available": seats_available,
             }
-        )
-    finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
+        }
+    ))
 
 
 @router.post("/api/trip/{trip_id}/status")
-async def update_trip_status(request: Request, trip_id: int):
+async def update_trip_status(request: Request, trip_id: int, db: Session = Depends(get_db)):
     _require_admin(request)
     data = await request.json()
     new_status = (data.get("status") or "").lower()
     if new_status not in ("active", "completed", "cancelled"):
         raise HTTPException(status_code=400, detail="Invalid status")
 
-    db_gen = get_db()
-    db: Session = next(db_gen)
-    try:
-        trip = db.query(Trip).filter(Trip.id == trip_id).first()
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found")
-        # Map string to enum (TripStatus has: active, completed, cancelled)
-        trip.status = TripStatus[new_status]
-        db.commit()
-        logging.info("admin.trip status updated trip_id=%s status=%s", trip_id, new_status)
-        return JSONResponse({"ok": True})
-    finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
+    # Map string to enum (TripStatus has: active, completed, cancelled)
+    result = db.execute(
+        update(Trip).where(Trip.id == trip_id).values(status=TripStatus[new_status])
+    )
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    db.commit()
+    invalidate_dashboard_cache()
+    logging.info("admin.trip status updated trip_id=%s status=%s", trip_id, new_status)
+    return ORJSONResponse({"ok": True})
 
 
 @router.post("/api/invite-links/{trip_id}/regenerate")
-async def regenerate_invite_links(request: Request, trip_id: int):
+async def regenerate_invite_links(request: Request, trip_id: int, db: Session = Depends(get_db)):
     _require_admin(request)
-    from bot import bot as tg_bot
-
-    db_gen = get_db()
-    db: Session = next(db_gen)
-    try:
-        trip = db.query(Trip).filter(Trip.id == trip_id).first()
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found")
-        if not trip.group_id:
-            raise HTTPException(status_code=400, detail="Trip has no group_id")
-
-        # Create a direct join link for paid participants
-        try:
-            p_link = await tg_bot.create_chat_invite_link(
-                chat_id=trip.group_id,
-                name=f"Participants - {trip.name}",
-                creates_join_request=False,
-            )
-            trip.participant_invite_link = p_link.invite_link if hasattr(p_link, 'invite_link') else getattr(p_link, 'invite_link', None)
-        except Exception as e:
-            logging.error(f"Failed to create participant link: {e}")
-            raise HTTPException(status_code=502, detail="Failed to create participant link")
-
-        # Create a join-request link for guests
-        try:
-            g_link = await tg_bot.create_chat_invite_link(
-                chat_id=trip.group_id,
-                name=f"Guests - {trip.name}",
-                creates_join_request=True,
-            )
-            trip.guest_invite_link = g_link.invite_link if hasattr(g_link, 'invite_link') else getattr(g_link, 'invite_link', None)
-        except Exception as e:
-            logging.error(f"Failed to create guest link: {e}")
-            raise HTTPException(status_code=502, detail="Failed to create guest link")
 
-        db.commit()
-        logging.info("admin.trip links regenerated trip_id=%s group_id=%s", trip_id, trip.group_id)
-        return JSONResponse({
-            "ok": True,
-            "participant_invite_link": trip.participant_invite_link,
-            "guest_invite_link": trip.guest_invite_link,
-        })
-    finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
+    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    if not trip.group_id:
+        raise HTTPException(status_code=400, detail="Trip has no group_id")
+
+    # Create the participant (direct join) and guest (join-request) links concurrently
+    p_link, g_link = await asyncio.gather(
+        tg_bot.create_chat_invite_link(
+            chat_id=trip.group_id,
+            name=f"Participants - {trip.name}",
+            creates_join_request=False,
+        ),
+        tg_bot.create_chat_invite_link(
+            chat_id=trip.group_id,
+            name=f"Guests - {trip.name}",
+            creates_join_request=True,
+        ),
+        return_exceptions=True,
+    )
+    if isinstance(p_link, Exception):
+        logging.error(f"Failed to create participant link: {p_link}")
+        raise HTTPException(status_code=502, detail="Failed to create participant link")
+    if isinstance(g_link, Exception):
+        logging.error(f"Failed to create guest link: {g_link}")
+        raise HTTPException(status_code=502, detail="Failed to create guest link")
+
+    trip.participant_invite_link = getattr(p_link, 'invite_link', None)
+    trip.guest_invite_link = getattr(g_link, 'invite_link', None)
+
+    db.commit()
+    invalidate_trip_cache()
+    logging.info("admin.trip links regenerated trip_id=%s group_id=%s", trip_id, trip.group_id)
+    return ORJSONResponse({
+        "ok": True,
+        "participant_invite_link": trip.participant_invite_link,
+        "guest_invite_link": trip.guest_invite_link,
+    })
 
 
 @router.post("/api/member/{member_id}/status")
-async def update_member_status(request: Request, member_id: int):
+async def update_member_status(request: Request, member_id: int, db: Session = Depends(get_db)):
     _require_admin(request)
-    from bot import bot as tg_bot
-    from models.User import User
     
     data = await request.json()
     new_status = (data.get("status") or "").lower()
     if new_status not in ("not_paid", "half_paid", "full_paid"):
         raise HTTPException(status_code=400, detail="Invalid status")
 
-    db_gen = get_db()
-    db: Session = next(db_gen)
+    # Fetch the member together with user and trip info for notification
+    row = (
+        db.query(TripMember, User, Trip)
+        .join(User, User.id == TripMember.user_id)
+        .join(Trip, Trip.id == TripMember.trip_id)
+        .filter(TripMember.id == member_id)
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Member not found")
+    member, user, trip = row
+    
+    # Store old status for comparison
+    old_status = member.payment_status
+    
+    # Update status
+    new_status_obj = PaymentStatus[new_status]
+    member.payment_status = new_status_obj
+    db.commit()
+    invalidate_dashboard_cache()
+    
+    # Handle auto-kick when status changes to "Not Paid"
+    if new_status_obj == PaymentStatus.not_paid and trip.group_id:
+        try:
+            # Try to kick from group
+            await _remove_from_group(trip.group_id, user.telegram_id)
+            logging.info("admin.member auto-kicked member_id=%s tg_id=%s group_id=%s", 
+                       member_id, user.telegram_id, trip.group_id)
+        except Exception as e:
+            logging.error(f"Failed to kick user {user.telegram_id} from group {trip.group_id}: {e}")
+            # Continue even if kick fails (user might not be in group)
+    
+    # Send notification to user (user and trip are guaranteed by the JOIN above)
     try:
-        member = db.query(TripMember).filter(TripMember.id == member_id).first()
-        if not member:
-            raise HTTPException(status_code=404, detail="Member not found")
-        
-        # Get user and trip info for notification
-        user = db.query(User).filter(User.id == member.user_id).first()
-        trip = db.query(Trip).filter(Trip.id == member.trip_id).first()
-        
-        # Store old status for comparison
-        old_status = member.payment_status
-        
-        # Update status
-        new_status_obj = PaymentStatus[new_status]
-        member.payment_status = new_status_obj
-        db.commit()
-        
-        # Handle auto-kick when status changes to "Not Paid"
-        if new_status_obj == PaymentStatus.not_paid and user and trip and trip.group_id:
-            try:
-                # Try to kick from group
-                await tg_bot.ban_chat_member(trip.group_id, user.telegram_id)
-                await tg_bot.unban_chat_member(trip.group_id, user.telegram_id, only_if_banned=True)
-                logging.info("admin.member auto-kicked member_id=%s tg_id=%s group_id=%s", 
-                           member_id, user.telegram_id, trip.group_id)
-            except Exception as e:
-                logging.error(f"Failed to kick user {user.telegram_id} from group {trip.group_id}: {e}")
-                # Continue even if kick fails (user might not be in group)
-        
-        # Send notification to user
-        if user and trip:
-            try:
-                status_emoji = {
-                    PaymentStatus.not_paid: '❌',
-                    PaymentStatus.half_paid: '🟡',
-                    PaymentStatus.full_paid: '✅'
-                }
-                status_text = {
-                    PaymentStatus.not_paid: 'Not Paid',
-                    PaymentStatus.half_paid: 'Half Paid (50%)',
-                    PaymentStatus.full_paid: 'Full Paid (100%)'
-                }
-                
-                emoji = status_emoji.get(new_status_obj, '•')
-                text = status_text.get(new_status_obj, new_status)
-                
-                # Build notification message
-                msg = f"{emoji} <b>Payment Status Updated</b>\n\n"
-                msg += f"🎫 <b>Trip:</b> {trip.name}\n"
-                msg += f"💳 <b>New Status:</b> {text}\n\n"
-                
-                if new_status_obj == PaymentStatus.not_paid:
-                    msg += (
-                        "<b>⚠️ Your payment status has been reset to Not Paid.</b>\n\n"
-                        "<b>Important:</b>\n"
-                        "• Your seat is NO LONGER reserved\n"
-                        "• You have been removed from the trip group\n"
-                        "• Please make payment as soon as possible\n"
-                        "• Send your receipt to secure your spot again\n\n"
-                    )
-                    if trip.card_info:
-                        msg += f"💳 <b>Payment Info:</b>\n{trip.card_info}\n\n"
-                    half_price = trip.price // 2
-                    msg += f"💵 <b>Minimum Payment (50%):</b> {half_price:,} UZS\n"
-                    msg += f"💰 <b>Full Price:</b> {trip.price:,} UZS"
-                    
-                elif new_status_obj == PaymentStatus.half_paid:
-                    msg += (
-                        "<b>🎉 Your seat is now RESERVED!</b>\n\n"
-                        "<b>What's Next:</b>\n"
-                        "• You're confirmed for the trip!\n"
-                        "• Complete the remaining 50% before departure\n"
-                    )
-                    
-                    # Send group link if status changed from not_paid
-                    if old_status == PaymentStatus.not_paid and trip.participant_invite_link:
-                        msg += f"\n🔗 <b>Join the Trip Group:</b>\n<a href='{trip.participant_invite_link}'>👉 Click here to join</a>\n\n"
-                    elif trip.participant_invite_link:
-                        msg += f"• Trip group: <a href='{trip.participant_invite_link}'>Join Here</a>\n\n"
-                    else:
-                        msg += "• Trip group link coming soon!\n\n"
-                    
-                    remaining = trip.price // 2
-                    msg += f"💵 <b>Remaining Payment:</b> {remaining:,} UZS\n"
-                    msg += f"💰 <b>Total Trip Price:</b> {trip.price:,} UZS"
-                    
-                elif new_status_obj == PaymentStatus.full_paid:
-                    msg += (
-                        "<b>✅ You're FULLY PAID!</b>\n\n"
-                        "<b>🎉 Congratulations!</b>\n"
-                        "• All payments completed\n"
-                        "• You're all set for the trip\n"
-                    )
-                    
-                    # Send group link if status changed from not_paid
-                    if old_status == PaymentStatus.not_paid and trip.participant_invite_link:
-                        msg += f"\n🔗 <b>Join the Trip Group:</b>\n<a href='{trip.participant_invite_link}'>👉 Click here to join</a>\n\n"
-                    elif trip.participant_invite_link:
-                        msg += f"• Trip group: <a href='{trip.participant_invite_link}'>Join Here</a>\n\n"
-                    else:
-                        msg += "• Stay tuned for trip updates!\n\n"
-                    
-                    msg += f"💰 <b>Total Paid:</b> {trip.price:,} UZS\n\n"
-                    msg += "See you on the trip! 🌍✈️"
-                
-                await tg_bot.send_message(
-                    user.telegram_id,
-                    msg,
-                    parse_mode='HTML',
-                    disable_web_page_preview=True
-                )
-                logging.info("admin.member status notification sent member_id=%s status=%s tg_id=%s", 
-                           member_id, new_status, user.telegram_id)
-                
-            except Exception as e:
-                logging.error(f"Failed to send status update notification to user {user.telegram_id}: {e}")
-                # Don't fail the request if notification fails
-        
-        # Email sending temporarily disabled - will be re-enabled after admin discussion
-        # TODO: Add email confirmation when ready
+        emoji = _STATUS_EMOJI.get(new_status_obj, '•')
+        text = _STATUS_TEXT.get(new_status_obj, new_status)
+        # Format the prices once and reuse them in every branch
+        price_str = f"{trip.price:,}"
+        half_str = f"{trip.price // 2:,}"
+        
+        # Build notification message
+        msg = f"{emoji} <b>Payment Status Updated</b>\n\n"
+        msg += f"🎫 <b>Trip:</b> {trip.name}\n"
+        msg += f"💳 <b>New Status:</b> {text}\n\n"
+        
+        if new_status_obj == PaymentStatus.not_paid:
+            msg += (
+                "<b>⚠️ Your payment status has been reset to Not Paid.</b>\n\n"
+                "<b>Important:</b>\n"
+                "• Your seat is NO LONGER reserved\n"
+                "• You have been removed from the trip group\n"
+                "• Please make payment as soon as possible\n"
+                "• Send your receipt to secure your spot again\n\n"
+            )
+            if trip.card_info:
+                msg += f"💳 <b>Payment Info:</b>\n{trip.card_info}\n\n"
+            msg += f"💵 <b>Minimum Payment (50%):</b> {half_str} UZS\n"
+            msg += f"💰 <b>Full Price:</b> {price_str} UZS"
+            
+        elif new_status_obj == PaymentStatus.half_paid:
+            msg += (
+                "<b>🎉 Your seat is now RESERVED!</b>\n\n"
+                "<b>What's Next:</b>\n"
+                "• You're confirmed for the trip!\n"
+                "• Complete the remaining 50% before departure\n"
+            )
+            
+            # Send group link if status changed from not_paid
+            if old_status == PaymentStatus.not_paid and trip.participant_invite_link:
+                msg += f"\n🔗 <b>Join the Trip Group:</b>\n<a href='{trip.participant_invite_link}'>👉 Click here to join</a>\n\n"
+            elif trip.participant_invite_link:
+                msg += f"• Trip group: <a href='{trip.participant_invite_link}'>Join Here</a>\n\n"
+            else:
+                msg += "• Trip group link coming soon!\n\n"
+            
+            msg += f"💵 <b>Remaining Payment:</b> {half_str} UZS\n"
+            msg += f"💰 <b>Total Trip Price:</b> {price_str} UZS"
+            
+        elif new_status_obj == PaymentStatus.full_paid:
+            msg += (
+                "<b>✅ You're FULLY PAID!</b>\n\n"
+                "<b>🎉 Congratulations!</b>\n"
+                "• All payments completed\n"
+                "• You're all set for the trip\n"
+            )
+            
+            # Send group link if status changed from not_paid
+            if old_status == PaymentStatus.not_paid and trip.participant_invite_link:
+                msg += f"\n🔗 <b>Join the Trip Group:</b>\n<a href='{trip.participant_invite_link}'>👉 Click here to join</a>\n\n"
+            elif trip.participant_invite_link:
+                msg += f"• Trip group: <a href='{trip.participant_invite_link}'>Join Here</a>\n\n"
+            else:
+                msg += "• Stay tuned for trip updates!\n\n"
+            
+            msg += f"💰 <b>Total Paid:</b> {price_str} UZS\n\n"
+            msg += "See you on the trip! 🌍✈️"
+        
+        await tg_bot.send_message(
+            user.telegram_id,
+            msg,
+            parse_mode='HTML',
+            disable_web_page_preview=True
+        )
+        logging.info("admin.member status notification sent member_id=%s status=%s tg_id=%s", 
+                   member_id, new_status, user.telegram_id)
         
-        logging.info("admin.member status updated member_id=%s old_status=%s new_status=%s", 
-                    member_id, old_status.value if old_status else None, new_status)
-        return JSONResponse({"ok": True})
-    finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
+    except Exception as e:
+        logging.error(f"Failed to send status update notification to user {user.telegram_id}: {e}")
+        # Don't fail the request if notification fails
+    
+    # Email sending temporarily disabled - will be re-enabled after admin discussion
+    # TODO: Add email confirmation when ready
+    
+    logging.info("admin.member status updated member_id=%s old_status=%s new_status=%s", 
+                member_id, old_status.value if old_status else None, new_status)
+    return ORJSONResponse({"ok": True})
 
 
 @router.post("/api/member/{member_id}/kick")
-async def kick_member(request: Request, member_id: int):
+async def kick_member(request: Request, member_id: int, db: Session = Depends(get_db)):
     _require_admin(request)
-    from bot import bot as tg_bot
-    from models.User import User
 
-    db_gen = get_db()
-    db: Session = next(db_gen)
+    # Member, trip and user in one round trip; only the two ids are needed
+    row = (
+        db.query(User.telegram_id, Trip.group_id)
+        .select_from(TripMember)
+        .join(User, User.id == TripMember.user_id)
+        .join(Trip, Trip.id == TripMember.trip_id)
+        .filter(TripMember.id == member_id)
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Member not found")
+    telegram_id, group_id = row
+    if not group_id:
+        raise HTTPException(status_code=400, detail="Missing group or user")
+
     try:
-        member = db.query(TripMember).filter(TripMember.id == member_id).first()
-        if not member:
-            raise HTTPException(status_code=404, detail="Member not found")
-        trip = db.query(Trip).filter(Trip.id == member.trip_id).first()
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found")
-        user = db.query(User).filter(User.id == member.user_id).first()
-        if not user or not trip.group_id:
-            raise HTTPException(status_code=400, detail="Missing group or user")
+        await _remove_from_group(group_id, telegram_id)
+    except Exception as e:
+        logging.error(f"Failed to kick user {telegram_id}: {e}")
+        raise HTTPException(status_code=502, detail="Failed to kick user")
 
-        try:
-            await tg_bot.ban_chat_member(trip.group_id, user.telegram_id)
-            await tg_bot.unban_chat_member(trip.group_id, user.telegram_id, only_if_banned=True)
-        except Exception as e:
-            logging.error(f"Failed to kick user {user.telegram_id}: {e}")
-            raise HTTPException(status_code=502, detail="Failed to kick user")
+    logging.info("admin.member kicked member_id=%s group_id=%s", member_id, group_id)
+    return ORJSONResponse({"ok": True})
 
-        logging.info("admin.member kicked member_id=%s group_id=%s", member_id, trip.group_id)
-        return JSONResponse({"ok": True})
-    finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
+
+class _UploadView(io.IOBase):
+    """Read-only view of a file whose close() leaves the underlying file open.
+
+    aiohttp closes file payloads once a multipart upload finishes, so Telegram
+    gets this view and the spooled export stays readable for the download.
+    """
+
+    def __init__(self, fileobj):
+        self._file = fileobj
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def close(self) -> None:
+        pass
 
 
 @router.get("/api/trip/{trip_id}/export-excel")
-async def export_trip_excel(request: Request, trip_id: int, send_to_chat: bool = False):
+async def export_trip_excel(request: Request, trip_id: int, send_to_chat: bool = False, db: Session = Depends(get_db)):
     """Export trip members to a styled Excel file and optionally send to Telegram chat."""
     _require_admin(request)
-    from models.User import User
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-    from openpyxl.utils import get_column_letter
-    import io
-    from bot import bot
     
-    db_gen = get_db()
-    db: Session = next(db_gen)
+    # Get trip and members
+    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
     
-    try:
-        # Get trip and members
-        trip = db.query(Trip).filter(Trip.id == trip_id).first()
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found")
-        
-        members = (
-            db.query(TripMember, User)
-            .join(User, User.id == TripMember.user_id)
-            .filter(TripMember.trip_id == trip_id)
-            .order_by(TripMember.joined_at)
-            .all()
-        )
-        
-        # Create workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Trip Members"
-        
-        # Define styles
-        header_fill = PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=12)
-        header_alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Payment status colors
-        status_colors = {
-            "not_paid": "FEE2E2",      # Red
-            "half_paid": "FEF3C7",     # Yellow
-            "full_paid": "D1FAE5"      # Green
-        }
-        
-        border_style = Border(
-            left=Side(style='thin', color='D1D5DB'),
-            right=Side(style='thin', color='D1D5DB'),
-            top=Side(style='thin', color='D1D5DB'),
-            bottom=Side(style='thin', color='D1D5DB')
-        )
-        
-        # Title row
-        ws.merge_cells('A1:H1')
-        title_cell = ws['A1']
-        title_cell.value = f"🎫 {trip.name} - Member List"
-        title_cell.font = Font(bold=True, size=16, color="1F2937")
-        title_cell.alignment = Alignment(horizontal="center", vertical="center")
-        title_cell.fill = PatternFill(start_color="F3F4F6", end_color="F3F4F6", fill_type="solid")
-        ws.row_dimensions[1].height = 30
-        
-        # Info row
-        ws.merge_cells('A2:H2')
-        info_cell = ws['A2']
-        info_cell.value = f"💰 Price: {trip.price:,} UZS  |  📅 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        info_cell.font = Font(size=10, color="6B7280")
-        info_cell.alignment = Alignment(horizontal="center", vertical="center")
-        ws.row_dimensions[2].height = 20
-        
-        # Headers
-        headers = ["#", "Full Name", "Telegram ID", "Email", "Payment Status", "Joined Date", "Receipt", "Amount Paid"]
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=4, column=col_num)
-            cell.value = header
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = border_style
-        
-        ws.row_dimensions[4].height = 25
-        
-        # Data rows
-        for idx, (member, user) in enumerate(members, 1):
-            row = idx + 4
-            
-            # Row data
-            full_name = f"{user.first_name or ''} {user.last_name or ''}".strip()
-            status_text = member.payment_status.value.replace('_', ' ').title()
-            joined_date = member.joined_at.strftime('%Y-%m-%d %H:%M') if member.joined_at else ""
-            has_receipt = "✅ Yes" if member.payment_receipt_file_id else "❌ No"
-            
-            # Calculate amount paid based on status
-            if member.payment_status == PaymentStatus.full_paid:
-                amount_paid = f"{trip.price:,} UZS"
-            elif member.payment_status == PaymentStatus.half_paid:
-                amount_paid = f"{trip.price // 2:,} UZS"
-            else:
-                amount_paid = "0 UZS"
-            
-            row_data = [
-                idx,
-                full_name,
-                user.telegram_id,
-                user.email,
-                status_text,
-                joined_date,
-                has_receipt,
-                amount_paid
-            ]
-            
-            # Fill row
-            for col_num, value in enumerate(row_data, 1):
-                cell = ws.cell(row=row, column=col_num)
-                cell.value = value
-                cell.border = border_style
-                cell.alignment = Alignment(horizontal="left" if col_num in [2, 4] else "center", vertical="center")
-                
-                # Color based on payment status
-                status_color = status_colors.get(member.payment_status.value, "FFFFFF")
-                cell.fill = PatternFill(start_color=status_color, end_color=status_color, fill_type="solid")
-                
-                # Make payment status bold
-                if col_num == 5:
-                    cell.font = Font(bold=True)
-            
-            ws.row_dimensions[row].height = 20
-        
-        # Summary row
-        summary_row = len(members) + 6
-        ws.merge_cells(f'A{summary_row}:D{summary_row}')
-        summary_cell = ws[f'A{summary_row}']
-        
-        total_count = len(members)
-        half_paid_count = sum(1 for m, u in members if m.payment_status == PaymentStatus.half_paid)
-        full_paid_count = sum(1 for m, u in members if m.payment_status == PaymentStatus.full_paid)
-        not_paid_count = total_count - half_paid_count - full_paid_count
-        
-        summary_cell.value = f"📊 Total: {total_count} | ❌ Not Paid: {not_paid_count} | 🟡 Half Paid: {half_paid_count} | ✅ Full Paid: {full_paid_count}"
-        summary_cell.font = Font(bold=True, size=11)
-        summary_cell.alignment = Alignment(horizontal="center", vertical="center")
-        summary_cell.fill = PatternFill(start_color="E5E7EB", end_color="E5E7EB", fill_type="solid")
-        ws.row_dimensions[summary_row].height = 25
-        
-        # Adjust column widths
-        column_widths = [5, 25, 15, 30, 18, 20, 12, 15]
-        for col_num, width in enumerate(column_widths, 1):
-            ws.column_dimensions[get_column_letter(col_num)].width = width
-        
-        # Save to BytesIO
-        excel_file = BytesIO()
-        wb.save(excel_file)
-        excel_file.seek(0)
-        
-        # Generate filename
-        filename = f"{trip.name.replace(' ', '_')}_Members_{datetime.now().strftime('%Y%m%d')}.xlsx"
-        
-        # Send to chat if requested
-        if send_to_chat:
-            try:
-                # Get admin's Telegram ID from request header
-                tg_id = request.headers.get('X-Telegram-Id')
-                if tg_id:
-                    tg_id = int(tg_id)
-                    # Create a copy of the file for sending
-                    excel_file_copy = BytesIO(excel_file.getvalue())
-                    excel_file_copy.name = filename
-                    
-                    # Send document to chat
-                    await bot.send_document(
-                        tg_id,
-                        excel_file_copy,
-                        caption=f"📊 <b>{trip.name}</b>\n\nMember list export\n📅 {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-                        parse_mode='HTML'
-                    )
-                    logging.info("admin.export_excel sent_to_chat trip_id=%s tg_id=%s", trip_id, tg_id)
-            except Exception as e:
-                logging.error(f"Failed to send Excel to chat: {e}")
-        
-        logging.info("admin.export_excel trip_id=%s members=%s", trip_id, len(members))
-        
-        # Reset file position for download
-        excel_file.seek(0)
-        
-        return StreamingResponse(
-            excel_file,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-        
-    finally:
+    members = (
+        db.query(TripMember, User)
+        .join(User, User.id == TripMember.user_id)
+        .filter(TripMember.trip_id == trip_id)
+        .order_by(TripMember.joined_at)
+        .all()
+    )
+    
+    # Write-only workbook streams rows out instead of keeping a full cell graph in memory.
+    # Row heights and column widths must be set before the rows are appended.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Trip Members")
+    
+    def styled_cell(value, font=None, fill=None, alignment=None, border=None):
+        cell = WriteOnlyCell(ws, value=value)
+        if font is not None:
+            cell.font = font
+        if fill is not None:
+            cell.fill = fill
+        if alignment is not None:
+            cell.alignment = alignment
+        if border is not None:
+            cell.border = border
+        return cell
+    
+    # Adjust column widths
+    column_widths = [5, 25, 15, 30, 18, 20, 12, 15]
+    for col_num, width in enumerate(column_widths, 1):
+        ws.column_dimensions[get_column_letter(col_num)].width = width
+    
+    # Title row
+    ws.merged_cells.add('A1:H1')
+    ws.row_dimensions[1].height = 30
+    ws.append([styled_cell(
+        f"🎫 {trip.name} - Member List",
+        font=_XLSX_TITLE_FONT,
+        fill=_XLSX_TITLE_FILL,
+        alignment=_XLSX_CENTER_ALIGN,
+    )])
+    
+    # Info row
+    ws.merged_cells.add('A2:H2')
+    ws.row_dimensions[2].height = 20
+    ws.append([styled_cell(
+        f"💰 Price: {trip.price:,} UZS  |  📅 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        font=_XLSX_INFO_FONT,
+        alignment=_XLSX_CENTER_ALIGN,
+    )])
+    ws.append([])
+    
+    # Headers
+    headers = ["#", "Full Name", "Telegram ID", "Email", "Payment Status", "Joined Date", "Receipt", "Amount Paid"]
+    ws.row_dimensions[4].height = 25
+    ws.append([
+        styled_cell(header, font=_XLSX_HEADER_FONT, fill=_XLSX_HEADER_FILL, alignment=_XLSX_CENTER_ALIGN, border=_XLSX_BORDER)
+        for header in headers
+    ])
+    
+    # Amount paid depends only on status; format each value once per export
+    amount_paid = {
+        PaymentStatus.full_paid: f"{trip.price:,} UZS",
+        PaymentStatus.half_paid: f"{trip.price // 2:,} UZS",
+        PaymentStatus.not_paid: "0 UZS",
+    }
+    
+    # Data rows
+    for idx, (member, user) in enumerate(members, 1):
+        row = idx + 4
+        
+        row_data = [
+            idx,
+            f"{user.first_name or ''} {user.last_name or ''}".strip(),
+            user.telegram_id,
+            user.email,
+            _XLSX_STATUS_LABELS[member.payment_status],
+            member.joined_at.strftime('%Y-%m-%d %H:%M') if member.joined_at else "",
+            "✅ Yes" if member.payment_receipt_file_id else "❌ No",
+            amount_paid[member.payment_status],
+        ]
+        
+        # Color based on payment status
+        row_fill = _XLSX_STATUS_FILLS.get(member.payment_status, _XLSX_DEFAULT_FILL)
+        
+        # Fill row; payment status (column 5) is bold
+        ws.row_dimensions[row].height = 20
+        ws.append([
+            styled_cell(
+                value,
+                font=_XLSX_BOLD_FONT if col_num == 5 else None,
+                fill=row_fill,
+                alignment=_XLSX_LEFT_ALIGN if col_num in (2, 4) else _XLSX_CENTER_ALIGN,
+                border=_XLSX_BORDER,
+            )
+            for col_num, value in enumerate(row_data, 1)
+        ])
+    
+    # Summary row
+    summary_row = len(members) + 6
+    ws.append([])
+    
+    total_count = len(members)
+    status_counts = Counter(m.payment_status for m, u in members)
+    half_paid_count = status_counts[PaymentStatus.half_paid]
+    full_paid_count = status_counts[PaymentStatus.full_paid]
+    not_paid_count = total_count - half_paid_count - full_paid_count
+    
+    ws.merged_cells.add(f'A{summary_row}:D{summary_row}')
+    ws.row_dimensions[summary_row].height = 25
+    ws.append([styled_cell(
+        f"📊 Total: {total_count} | ❌ Not Paid: {not_paid_count} | 🟡 Half Paid: {half_paid_count} | ✅ Full Paid: {full_paid_count}",
+        font=_XLSX_SUMMARY_FONT,
+        fill=_XLSX_SUMMARY_FILL,
+        alignment=_XLSX_CENTER_ALIGN,
+    )])
+    
+    # Generate filename
+    filename = f"{trip.name.replace(' ', '_')}_Members_{datetime.now().strftime('%Y%m%d')}.xlsx"
+    
+    # Save to a spooled temp file: kept in memory for typical exports, spills to disk for large ones
+    excel_file = SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    wb.save(excel_file)
+    excel_file.seek(0)
+    
+    # Send to chat if requested
+    if send_to_chat:
         try:
-            next(db_gen)
-        except StopIteration:
-            pass
+            # Get admin's Telegram ID from request header
+            tg_id = request.headers.get('X-Telegram-Id')
+            if tg_id:
+                tg_id = int(tg_id)
+                # Upload through a view so aiohttp closing the payload does not close the spool
+                await tg_bot.send_document(
+                    tg_id,
+                    _UploadView(excel_file),
+                    visible_file_name=filename,
+                    caption=f"📊 <b>{trip.name}</b>\n\nMember list export\n📅 {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+                    parse_mode='HTML'
+                )
+                logging.info("admin.export_excel sent_to_chat trip_id=%s tg_id=%s", trip_id, tg_id)
+        except Exception as e:
+            logging.error(f"Failed to send Excel to chat: {e}")
+    
+    logging.info("admin.export_excel trip_id=%s members=%s", trip_id, len(members))
+    
+    # Reset file position for download
+    excel_file.seek(0)
+    
+    return StreamingResponse(
+        iter(lambda: excel_file.read(64 * 1024), b""),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        background=BackgroundTask(excel_file.close),
+    )
 
 
 @router.get("/trip/{trip_id}/edit")
-async def edit_trip_page(request: Request, trip_id: int):
+async def edit_trip_page(request: Request, trip_id: int, db: Session = Depends(get_db)):
     """Show edit trip form."""
     # Check if request is from Telegram WebApp
-    error_response = require_telegram_webapp(request, Config.BOT_USERNAME)
+    error_response = require_telegram_webapp(request, _BOT_USERNAME)
     if error_response:
         return error_response
     
-    db_gen = get_db()
-    db: Session = next(db_gen)
+    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
     
-    try:
-        trip = db.query(Trip).filter(Trip.id == trip_id).first()
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found")
-        
-        return templates.TemplateResponse(
-            "edit_trip.html",
-            {
-                "request": request,
-                "trip": trip,
-            }
-        )
-    finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
+    return templates.TemplateResponse(
+        "edit_trip.html",
+        {
+            "request": request,
+            "trip": trip,
+        }
+    )
 
 
 @router.post("/api/trip/{trip_id}/update")
-async def update_trip(request: Request, trip_id: int):
+async def update_trip(request: Request, trip_id: int, db: Session = Depends(get_db)):
     """Update trip properties."""
     _require_admin(request)
     
-    db_gen = get_db()
-    db: Session = next(db_gen)
-    
     try:
-        trip = db.query(Trip).filter(Trip.id == trip_id).first()
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found")
-        
         # Get form data
         form_data = await request.json()
         
-        # Update fields
+        # Collect only the provided fields so a single UPDATE touches just those columns
+        values = {}
         if 'name' in form_data:
-            trip.name = form_data['name'].strip()
+            values['name'] = form_data['name'].strip()
         if 'price' in form_data:
-            trip.price = int(form_data['price'])
+            values['price'] = int(form_data['price'])
         if 'participant_limit' in form_data:
             limit_value = form_data['participant_limit']
-            trip.participant_limit = int(limit_value) if limit_value and str(limit_value).strip() else None
+            values['participant_limit'] = int(limit_value) if limit_value and str(limit_value).strip() else None
         if 'card_info' in form_data:
-            trip.card_info = form_data['card_info'].strip() or None
+            values['card_info'] = form_data['card_info'].strip() or None
         if 'agreement_text' in form_data:
-            trip.agreement_text = form_data['agreement_text'].strip() or None
-        
+            values['agreement_text'] = form_data['agreement_text'].strip() or None
+        
+        columns = (Trip.id, Trip.name, Trip.price, Trip.participant_limit, Trip.card_info, Trip.agreement_text)
+        if values:
+            # UPDATE ... RETURNING gives back the refreshed row in the same round-trip
+            trip = db.execute(
+                update(Trip).where(Trip.id == trip_id).values(**values).returning(*columns)
+            ).first()
+        else:
+            trip = db.execute(select(*columns).where(Trip.id == trip_id)).first()
+        if not trip:
+            raise HTTPException(status_code=404, detail="Trip not found")
         db.commit()
-        db.refresh(trip)
+        invalidate_dashboard_cache()
+        invalidate_trip_cache()
         
         logging.info("admin.trip_updated trip_id=%s", trip_id)
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "message": "Trip updated successfully",
             "trip": {
@@ -719,20 +779,17 @@ async def update_trip(request: Request, trip_id: int):
             }
         })
         
+    except HTTPException:
+        raise
     except ValueError as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=400,
             content={"success": False, "message": f"Invalid input: {str(e)}"}
         )
     except Exception as e:
         db.rollback()
         logging.error(f"Error updating trip {trip_id}: {e}", exc_info=True)
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"success": False, "message": "Failed to update trip"}
         )
-    finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
@@ -1,25 +1,76 @@
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
 from starlette.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from pathlib import Path
-import requests
+import httpx
 import logging
-import asyncio
 
 from config import Config
+from templating import templates
 from database import get_db
 from models.User import User
 from utils.text_utils import format_name
+from utils.http_client import http_client
+from bot import bot
 
 router = APIRouter(prefix="", tags=["auth"])
 
-# Setup Jinja2 templates
-BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+_BOT_USERNAME_CLEAN = Config.BOT_USERNAME.lstrip('@')  # Remove @ if present
+
+# Google OAuth endpoints and token-exchange fields; only `code` varies per callback
+_TOKEN_URL = "https://oauth2.googleapis.com/token"
+_TOKENINFO_URL = "https://oauth2.googleapis.com/tokeninfo"
+_REDIRECT_URI = Config.get_oauth_redirect_uri()
+_BASE_PAYLOAD = {
+    "client_id": Config.CLIENT_ID,
+    "client_secret": Config.CLIENT_SECRET,
+    "redirect_uri": _REDIRECT_URI,
+    "grant_type": "authorization_code",
+}
+_ALLOWED_EMAIL_SUFFIXES = ("@newuu.uz",)
+_ALLOWED_HOSTED_DOMAIN = "newuu.uz"
+
+_ONBOARDING_HELP_TEXT = (
+    "📖 <b>Quick Start Guide</b>\n\n"
+    "<b>Available Commands:</b>\n"
+    "🎫 <b>/trips</b> – Browse and register for trips\n"
+    "💳 <b>/mystatus</b> – Check your payment status\n"
+    "📊 <b>/stats</b> – View trip statistics\n"
+    "📅 <b>/agenda</b> – View trip schedules\n"
+    "🧭 <b>/menu</b> – Main menu with all options\n"
+    "❓ <b>/help</b> – Full usage guide\n\n"
+    "<b>How it works:</b>\n"
+    "1️⃣ Find a trip with /trips\n"
+    "2️⃣ Register and confirm the agreement\n"
+    "3️⃣ Upload a 50% payment receipt\n"
+    "4️⃣ Upload final payment receipt to complete\n"
+    "5️⃣ Get your confirmed seat!\n\n"
+    "💡 <i>Tip: Use /menu anytime to see available actions.</i>"
+)
+
+
+async def _send_onboarding(tg_id: int) -> None:
+    """Send the welcome and quick start messages to a newly registered user.
+
+    Runs as a background task after the success page has been returned.
+    The messages are sent in order so the welcome always arrives first.
+    """
+    try:
+        await bot.send_message(
+            tg_id,
+            "🎉 <b>Registration Successful!</b>\n\n"
+            "Welcome to Travel Bot! You're all set to start exploring trips.",
+            parse_mode='HTML'
+        )
+    except Exception as e:
+        logging.warning(f"Failed to queue success message to user {tg_id}: {e}")
+
+    try:
+        await bot.send_message(tg_id, _ONBOARDING_HELP_TEXT, parse_mode='HTML')
+    except Exception as e:
+        logging.warning(f"Failed to queue instructions to user {tg_id}: {e}")
 
 
 @router.get("/auth/callback", response_class=HTMLResponse)
-async def auth_callback(request: Request):
+async def auth_callback(request: Request, background_tasks: BackgroundTasks):
     """Handle Google OAuth callback.
 
     Expects `code` and `state` query params. `state` should contain the Telegram id.
@@ -33,26 +84,18 @@ async def auth_callback(request: Request):
         raise HTTPException(status_code=400, detail="Missing code or state")
 
     # Exchange code for tokens
-    token_url = "https://oauth2.googleapis.com/token"
-    redirect_uri = Config.get_oauth_redirect_uri()
-    payload = {
-        "code": code,
-        "client_id": Config.CLIENT_ID,
-        "client_secret": Config.CLIENT_SECRET,
-        "redirect_uri": redirect_uri,
-        "grant_type": "authorization_code",
-    }
+    payload = {**_BASE_PAYLOAD, "code": code}
 
     try:
-        token_resp = requests.post(token_url, data=payload, timeout=10)
+        token_resp = await http_client.post(_TOKEN_URL, data=payload)
         token_resp.raise_for_status()
         tokens = token_resp.json()
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         logging.exception("auth.exchange failed")
         # Return user-friendly error page
         error_detail = "Unknown error"
         try:
-            error_data = e.response.json() if e.response else {}
+            error_data = e.response.json()
             error_detail = error_data.get("error_description", error_data.get("error", str(e)))
         except:
             error_detail = str(e)
@@ -66,7 +109,7 @@ async def auth_callback(request: Request):
                     f"Failed to complete sign-in: {error_detail}\n\n"
                     f"⚙️ Admin Action Required:\n"
                     f"Add this redirect URI to Google Cloud Console:\n"
-                    f"👉 {redirect_uri}\n\n"
+                    f"👉 {_REDIRECT_URI}\n\n"
                     f"Go to: Google Cloud Console → APIs & Services → Credentials → "
                     f"OAuth 2.0 Client IDs → Edit → Authorized redirect URIs"
                 ),
@@ -84,7 +127,7 @@ async def auth_callback(request: Request):
 
     # Validate id_token using Google's tokeninfo endpoint
     try:
-        info_resp = requests.get("https://oauth2.googleapis.com/tokeninfo", params={"id_token": id_token}, timeout=10)
+        info_resp = await http_client.get(_TOKENINFO_URL, params={"id_token": id_token})
         info_resp.raise_for_status()
         info = info_resp.json()
     except Exception as e:
@@ -96,7 +139,7 @@ async def auth_callback(request: Request):
     hosted_domain = info.get("hd")
 
     # Enforce newuu.uz domain
-    if not email or not email_verified or not (email.endswith("@newuu.uz") or hosted_domain == "newuu.uz"):
+    if not email or not email_verified or not (email.endswith(_ALLOWED_EMAIL_SUFFIXES) or hosted_domain == _ALLOWED_HOSTED_DOMAIN):
         return templates.TemplateResponse(
             "error.html",
             {
@@ -153,39 +196,8 @@ async def auth_callback(request: Request):
         db.commit()
         db.refresh(user)
         
-        # Send onboarding messages to user
-        from bot import bot
-        try:
-            await bot.send_message(
-                tg_id,
-                "🎉 <b>Registration Successful!</b>\n\n"
-                "Welcome to Travel Bot! You're all set to start exploring trips.",
-                parse_mode='HTML'
-            )
-        except Exception as e:
-            logging.warning(f"Failed to queue success message to user {tg_id}: {e}")
-        
-        try:
-            help_text = (
-                "📖 <b>Quick Start Guide</b>\n\n"
-                "<b>Available Commands:</b>\n"
-                "🎫 <b>/trips</b> – Browse and register for trips\n"
-                "💳 <b>/mystatus</b> – Check your payment status\n"
-                "📊 <b>/stats</b> – View trip statistics\n"
-                "📅 <b>/agenda</b> – View trip schedules\n"
-                "🧭 <b>/menu</b> – Main menu with all options\n"
-                "❓ <b>/help</b> – Full usage guide\n\n"
-                "<b>How it works:</b>\n"
-                "1️⃣ Find a trip with /trips\n"
-                "2️⃣ Register and confirm the agreement\n"
-                "3️⃣ Upload a 50% payment receipt\n"
-                "4️⃣ Upload final payment receipt to complete\n"
-                "5️⃣ Get your confirmed seat!\n\n"
-                "💡 <i>Tip: Use /menu anytime to see available actions.</i>"
-            )
-            await bot.send_message(tg_id, help_text, parse_mode='HTML')
-        except Exception as e:
-            logging.warning(f"Failed to queue instructions to user {tg_id}: {e}")
+        # Send onboarding messages after the response so the success page isn't delayed
+        background_tasks.add_task(_send_onboarding, tg_id)
         
         # Build user display name
         user_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or email.split('@')[0]
@@ -200,7 +212,7 @@ async def auth_callback(request: Request):
                 "last_name": user.last_name or "",
                 "telegram_id": tg_id,
                 "user_name": user_name,
-                "bot_username": Config.BOT_USERNAME.lstrip('@')  # Remove @ if present
+                "bot_username": _BOT_USERNAME_CLEAN
             }
         )
     except Exception as e:
@@ -1,18 +1,87 @@
 """API routes for trip management."""
 
-from fastapi import APIRouter, HTTPException, Depends, Body
+from fastapi import APIRouter, HTTPException, Depends, Body, Request
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
+import asyncio
 import logging
 
 from database import get_db
 from models.Trip import Trip
 from bot import bot
+from utils.http_cache import TTLCache, etag_response, make_etag
 
 router = APIRouter(prefix="/api/trips", tags=["trips"])
 
 
+# Serialized trip responses keyed by ("id", trip_id) / ("group", group_id).
+# Trip metadata changes rarely; writes call invalidate_trip_cache().
+_TRIP_CACHE_TTL = 60
+_trip_cache = TTLCache(ttl=_TRIP_CACHE_TTL, max_entries=512)
+
+# Admin dashboard rows keyed by (page, per_page), filled by routers.admin. Kept
+# here with the trip cache so every trip write path can clear both.
+dashboard_cache = TTLCache(ttl=15, max_entries=8)
+
+
+# Columns served by TripResponse; selected directly to skip ORM object loading
+_TRIP_COLUMNS = (
+    Trip.id,
+    Trip.name,
+    Trip.group_id,
+    Trip.participant_limit,
+    Trip.price,
+    Trip.card_info,
+    Trip.agreement_text,
+    Trip.participant_invite_link,
+    Trip.guest_invite_link,
+)
+
+
+def invalidate_trip_cache() -> None:
+    """Drop cached trip responses after a trip is created or edited."""
+    _trip_cache.clear()
+
+
+def invalidate_dashboard_cache() -> None:
+    """Drop cached admin dashboard rows after a trip or member changes."""
+    dashboard_cache.clear()
+
+
+def _cached_trip_response(request: Request, key: tuple[str, int], load) -> Optional[Response]:
+    """Serve a trip as JSON from the TTL cache with an ETag, loading it on a miss.
+
+    `load` returns a row of _TRIP_COLUMNS or None; None is not cached so new trips
+    show up at once.
+    """
+    cached = _trip_cache.get(key)
+    if cached:
+        body, etag = cached
+    else:
+        row = load()
+        if row is None:
+            return None
+        body = TripResponse(**row._mapping).model_dump_json().encode()
+        etag = make_etag(body)
+        _trip_cache.set(key, (body, etag))
+
+    return etag_response(
+        request, body, f"private, max-age={_TRIP_CACHE_TTL}", media_type="application/json", etag=etag
+    )
+
+
+def _dialect_insert(db: Session):
+    """Return the INSERT construct supporting ON CONFLICT for the session's database."""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert
+    return pg_insert
+
+
 class CreateTripRequest(BaseModel):
     """Request model for creating a new trip."""
     name: str = Field(..., description="Trip name")
@@ -35,11 +104,10 @@ class TripResponse(BaseModel):
     participant_invite_link: Optional[str] = None
     guest_invite_link: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
-@router.post("/create", response_model=TripResponse)
+@router.post("/create", response_model=None)
 async def create_trip(trip_data: CreateTripRequest, db: Session = Depends(get_db)):
     """Create a new trip for a group.
     
@@ -62,43 +130,64 @@ async def create_trip(trip_data: CreateTripRequest, db: Session = Depends(get_db
     )
 
     try:
-        # Check if a trip already exists for this group
-        existing_trip = db.query(Trip).filter(Trip.group_id == trip_data.group_id).first()
-        if existing_trip:
+        # Insert and enforce the unique group_id in one statement; no SELECT-then-INSERT race
+        stmt = (
+            _dialect_insert(db)(Trip)
+            .values(
+                name=trip_data.name,
+                group_id=trip_data.group_id,
+                participant_limit=trip_data.participant_limit,
+                price=trip_data.price,
+                card_info=trip_data.card_info,
+                agreement_text=trip_data.agreement_text,
+            )
+            .on_conflict_do_nothing(index_elements=[Trip.group_id])
+            .returning(Trip)
+        )
+        new_trip = db.scalars(stmt).first()
+        if new_trip is None:
+            db.rollback()
+            existing_trip = db.execute(
+                select(Trip.id, Trip.name).where(Trip.group_id == trip_data.group_id)
+            ).first()
+            existing_id, existing_name = existing_trip or (None, "")
             logging.info(
                 "trip.create conflict existing_trip_id=%s group_id=%s",
-                existing_trip.id,
+                existing_id,
                 trip_data.group_id,
             )
             raise HTTPException(
                 status_code=400,
-                detail=f"A trip already exists for this group: {existing_trip.name}",
+                detail=f"A trip already exists for this group: {existing_name}",
             )
-
-        # Create new trip
-        new_trip = Trip(
-            name=trip_data.name,
-            group_id=trip_data.group_id,
-            participant_limit=trip_data.participant_limit,
-            price=trip_data.price,
-            card_info=trip_data.card_info,
-            agreement_text=trip_data.agreement_text,
-        )
-
-        db.add(new_trip)
         db.commit()
-        db.refresh(new_trip)
+        invalidate_trip_cache()
+        invalidate_dashboard_cache()
         logging.info(
             "trip.create success id=%s group_id=%s", new_trip.id, new_trip.group_id
         )
 
-        # Create invite links (best-effort; don't fail trip creation if these fail)
-        try:
-            participant_link = await bot.create_chat_invite_link(
+        # Create invite links concurrently (best-effort; don't fail trip creation if these fail)
+        participant_link, guest_link = await asyncio.gather(
+            bot.create_chat_invite_link(
                 chat_id=trip_data.group_id,
                 name=f"Participants - {trip_data.name}",
                 creates_join_request=False,
+            ),
+            bot.create_chat_invite_link(
+                chat_id=trip_data.group_id,
+                name=f"Guests - {trip_data.name}",
+                creates_join_request=True,
+            ),
+            return_exceptions=True,
+        )
+        if isinstance(participant_link, Exception):
+            logging.error(
+                "trip.invite participant link failed group_id=%s error=%s",
+                trip_data.group_id,
+                participant_link,
             )
+        else:
             new_trip.participant_invite_link = getattr(
                 participant_link, "invite_link", None
             )
@@ -106,23 +195,29 @@ async def create_trip(trip_data: CreateTripRequest, db: Session = Depends(get_db
                 "trip.invite participant link created group_id=%s",
                 trip_data.group_id,
             )
-
-            guest_link = await bot.create_chat_invite_link(
-                chat_id=trip_data.group_id,
-                name=f"Guests - {trip_data.name}",
-                creates_join_request=True,
+        if isinstance(guest_link, Exception):
+            logging.error(
+                "trip.invite guest link failed group_id=%s error=%s",
+                trip_data.group_id,
+                guest_link,
             )
+        else:
             new_trip.guest_invite_link = getattr(guest_link, "invite_link", None)
             logging.info(
                 "trip.invite guest link created group_id=%s", trip_data.group_id
             )
 
-            db.commit()
-            db.refresh(new_trip)
-        except Exception:
-            logging.exception("trip.invite failed group_id=%s", trip_data.group_id)
+        if new_trip.participant_invite_link or new_trip.guest_invite_link:
+            try:
+                db.commit()
+                invalidate_trip_cache()
+                db.refresh(new_trip)
+            except Exception:
+                db.rollback()
+                logging.exception("trip.invite save failed group_id=%s", trip_data.group_id)
 
-        return new_trip
+        # Serialize once here; response_model=None skips FastAPI's re-validation
+        return ORJSONResponse(TripResponse.model_validate(new_trip).model_dump(mode="json"))
 
     except HTTPException:
         raise
@@ -136,8 +231,8 @@ async def create_trip(trip_data: CreateTripRequest, db: Session = Depends(get_db
         raise HTTPException(status_code=500, detail=f"Failed to create trip: {str(e)}")
 
 
-@router.get("/{trip_id}", response_model=TripResponse)
-async def get_trip(trip_id: int, db: Session = Depends(get_db)):
+@router.get("/{trip_id}", response_model=None)
+def get_trip(trip_id: int, request: Request, db: Session = Depends(get_db)):
     """Get trip details by ID.
     
     Args:
@@ -150,16 +245,20 @@ async def get_trip(trip_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If trip not found
     """
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    response = _cached_trip_response(
+        request,
+        ("id", trip_id),
+        lambda: db.execute(select(*_TRIP_COLUMNS).where(Trip.id == trip_id)).first(),
+    )
     
-    if not trip:
+    if response is None:
         raise HTTPException(status_code=404, detail="Trip not found")
     
-    return trip
+    return response
 
 
-@router.get("/group/{group_id}", response_model=TripResponse)
-async def get_trip_by_group(group_id: int, db: Session = Depends(get_db)):
+@router.get("/group/{group_id}", response_model=None)
+def get_trip_by_group(group_id: int, request: Request, db: Session = Depends(get_db)):
     """Get trip details by group ID.
     
     Args:
@@ -172,9 +271,13 @@ async def get_trip_by_group(group_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If trip not found for this group
     """
-    trip = db.query(Trip).filter(Trip.group_id == group_id).first()
+    response = _cached_trip_response(
+        request,
+        ("group", group_id),
+        lambda: db.execute(select(*_TRIP_COLUMNS).where(Trip.group_id == group_id)).first(),
+    )
     
-    if not trip:
+    if response is None:
         raise HTTPException(status_code=404, detail="No trip found for this group")
     
-    return trip
+    return response
@@ -1,23 +1,23 @@
 """Telegram Web App routes for registration and other interactive flows."""
 
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, HTTPException, Depends
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from pathlib import Path
-import requests
 
 from config import Config
+from templating import templates, HOME_PAGE, PRIVACY_PAGE
 from database import get_db
 from models.User import User
+from models.Trip import Trip
+from models.TripMember import TripMember, PaymentStatus
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 import logging
 from webapp_security import require_telegram_webapp
 
 router = APIRouter(prefix="/webapp", tags=["webapp"])
 
-# Setup Jinja2 templates
-BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+_CLIENT_ID = Config.CLIENT_ID
+_REDIRECT_URI = Config.get_oauth_redirect_uri()
 
 
 @router.get("/home", response_class=HTMLResponse)
@@ -28,7 +28,7 @@ async def home_page(request: Request):
     Required for Google Cloud Console app publication.
     """
     logging.info("webapp.home render")
-    return templates.TemplateResponse("home.html", {"request": request})
+    return HOME_PAGE.response(request)
 
 
 @router.get("/privacy", response_class=HTMLResponse)
@@ -39,7 +39,7 @@ async def privacy_policy(request: Request):
     Required for Google Cloud Console app publication.
     """
     logging.info("webapp.privacy render")
-    return templates.TemplateResponse("privacy.html", {"request": request})
+    return PRIVACY_PAGE.response(request)
 
 
 @router.get("/register", response_class=HTMLResponse)
@@ -61,8 +61,8 @@ async def register_webapp(request: Request):
         "register.html",
         {
             "request": request,
-            "client_id": Config.CLIENT_ID,
-            "redirect_uri": Config.get_oauth_redirect_uri(),
+            "client_id": _CLIENT_ID,
+            "redirect_uri": _REDIRECT_URI,
         }
     )
 
@@ -99,11 +99,12 @@ async def create_trip_webapp(request: Request):
 
 
 @router.get("/trip-stats", response_class=HTMLResponse)
-async def trip_stats_webapp(request: Request):
+def trip_stats_webapp(request: Request, db: Session = Depends(get_db)):
     """Render a statistics page for a given trip.
     Shows counts for half-paid, full-paid, total registered, and seats available.
     
     Only accessible from Telegram WebApp for security.
+    Declared sync so FastAPI runs the blocking DB queries in its threadpool.
     """
     # Check if request is from Telegram WebApp
     error_response = require_telegram_webapp(request, Config.BOT_USERNAME)
@@ -119,61 +120,52 @@ async def trip_stats_webapp(request: Request):
     except ValueError:
         raise HTTPException(status_code=400, detail="trip_id must be an integer")
 
-    from models.Trip import Trip
-    from models.TripMember import TripMember, PaymentStatus
-
-    db_gen = get_db()
-    db: Session = next(db_gen)
-    try:
-        trip = db.query(Trip).filter(Trip.id == trip_id_int).first()
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found")
-
-        total_registered = db.query(TripMember).filter(TripMember.trip_id == trip.id).count()
-        half_paid = db.query(TripMember).filter(
-            TripMember.trip_id == trip.id,
-            TripMember.payment_status == PaymentStatus.half_paid
-        ).count()
-        full_paid = db.query(TripMember).filter(
-            TripMember.trip_id == trip.id,
-            TripMember.payment_status == PaymentStatus.full_paid
-        ).count()
-        # Half-paid and full-paid both reserve seats
-        paid_count = half_paid + full_paid
-
-        participant_limit = trip.participant_limit
-        if participant_limit is None:
-            seats_available = None
-            occupancy_pct = None
-        else:
-            seats_available = max(participant_limit - paid_count, 0)
-            occupancy_pct = int(min(paid_count / participant_limit * 100, 100)) if participant_limit > 0 else 0
-
-        logging.info(
-            "webapp.trip_stats render trip_id=%s total=%s half=%s full=%s paid=%s limit=%s",
-            trip.id, total_registered, half_paid, full_paid, paid_count, participant_limit,
-        )
-        return templates.TemplateResponse(
-            "trip_stats.html",
-            {
-                "request": request,
-                "trip": trip,
-                "trip_name": trip.name,
-                "price": trip.price,
-                "total_registered": total_registered,
-                "half_paid": half_paid,
-                "full_paid": full_paid,
-                "paid_count": paid_count,
-                "participant_limit": participant_limit,
-                "seats_available": seats_available,
-                "occupancy_pct": occupancy_pct,
-            }
-        )
-    finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
+    trip = db.execute(select(Trip).where(Trip.id == trip_id_int)).scalar_one_or_none()
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    # One GROUP BY instead of a COUNT per payment status
+    counts = dict(
+        db.execute(
+            select(TripMember.payment_status, func.count(TripMember.id))
+            .where(TripMember.trip_id == trip.id)
+            .group_by(TripMember.payment_status)
+        ).all()
+    )
+    total_registered = sum(counts.values())
+    half_paid = counts.get(PaymentStatus.half_paid, 0)
+    full_paid = counts.get(PaymentStatus.full_paid, 0)
+    # Half-paid and full-paid both reserve seats
+    paid_count = half_paid + full_paid
+
+    participant_limit = trip.participant_limit
+    if participant_limit is None:
+        seats_available = None
+        occupancy_pct = None
+    else:
+        seats_available = max(participant_limit - paid_count, 0)
+        occupancy_pct = int(min(paid_count / participant_limit * 100, 100)) if participant_limit > 0 else 0
+
+    logging.info(
+        "webapp.trip_stats render trip_id=%s total=%s half=%s full=%s paid=%s limit=%s",
+        trip.id, total_registered, half_paid, full_paid, paid_count, participant_limit,
+    )
+    return templates.TemplateResponse(
+        "trip_stats.html",
+        {
+            "request": request,
+            "trip": trip,
+            "trip_name": trip.name,
+            "price": trip.price,
+            "total_registered": total_registered,
+            "half_paid": half_paid,
+            "full_paid": full_paid,
+            "paid_count": paid_count,
+            "participant_limit": participant_limit,
+            "seats_available": seats_available,
+            "occupancy_pct": occupancy_pct,
+        }
+    )
 
 
 @router.get("/agenda", response_class=HTMLResponse)
@@ -1,34 +1,50 @@
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
+from fastapi.responses import ORJSONResponse
 from config import Config
 from bot import bot, types
-import requests
+import hmac
 import logging
+import orjson
+
+from utils.http_client import http_client
 
 router = APIRouter(prefix="/webhook", tags=["webhook"])
 
+_BOT_TOKEN = Config.BOT_TOKEN.encode()
+
 @router.get("/", include_in_schema=False)
 async def set_webhook():
     """Set webhook endpoint - hidden from docs for security."""
     url = f"https://api.telegram.org/bot{Config.BOT_TOKEN}/setWebhook"
     payload = {"url": f"{Config.URL}/webhook/{Config.BOT_TOKEN}"}
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = await http_client.post(url, json=payload)
         logging.info("webhook.set response=%s", response.text)
         return response.json()
     except Exception as e:
         logging.exception("webhook.set failed")
         return {"ok": False, "error": str(e)}
 
+async def _process_update(update: types.Update) -> None:
+    """Run bot handlers for one update; runs after Telegram has been answered."""
+    try:
+        await bot.process_new_updates([update])
+    except Exception:
+        logging.exception("webhook.update processing failed update_id=%s", update.update_id)
+
+
 @router.post('/{token}', include_in_schema=False)
-async def receive_webhook(request: Request, token: str):
+async def receive_webhook(request: Request, token: str, background_tasks: BackgroundTasks):
     """Receive webhook from Telegram - hidden from docs for security."""
     # Verify the token matches to prevent unauthorized access
-    if token != Config.BOT_TOKEN:
+    # Constant-time comparison so response timing does not reveal the token
+    if not hmac.compare_digest(token.encode(), _BOT_TOKEN):
         logging.warning("webhook.unauthorized_attempt token=%s", token[:10] + "...")
         raise HTTPException(status_code=403, detail="Forbidden")
     
-    data = await request.json()
-    logging.info("webhook.update received keys=%s", list(data.keys()))
+    data = orjson.loads(await request.body())
+    logging.info("webhook.update received update_id=%s", data.get("update_id"))
     update = types.Update.de_json(data)
-    await bot.process_new_updates([update])
-    return {"ok": True}
\ No newline at end of file
+    # Acknowledge immediately; handler latency no longer delays Telegram's delivery
+    background_tasks.add_task(_process_update, update)
+    return ORJSONResponse({"ok": True})
\ No newline at end of file
@@ -23,30 +23,19 @@ def add_cascade_delete():
             # Start transaction
             trans = conn.begin()
             
-            # Drop existing foreign key constraints
-            print("   Dropping old foreign key constraints...")
-            conn.execute(text("""
-                ALTER TABLE trip_members 
-                DROP CONSTRAINT IF EXISTS trip_members_user_id_fkey
-            """))
+            # Fail fast instead of queueing behind long-running queries on the table
+            conn.execute(text("SET LOCAL lock_timeout = '5s'"))
             
+            # Swap both foreign keys in one ALTER TABLE so the table is locked only once
+            print("   Replacing foreign key constraints with CASCADE versions...")
             conn.execute(text("""
                 ALTER TABLE trip_members 
-                DROP CONSTRAINT IF EXISTS trip_members_trip_id_fkey
-            """))
-            
-            # Add new foreign keys with CASCADE
-            print("   Adding new foreign keys with CASCADE...")
-            conn.execute(text("""
-                ALTER TABLE trip_members 
+                DROP CONSTRAINT IF EXISTS trip_members_user_id_fkey,
+                DROP CONSTRAINT IF EXISTS trip_members_trip_id_fkey,
                 ADD CONSTRAINT trip_members_user_id_fkey 
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            """))
-            
-            conn.execute(text("""
-                ALTER TABLE trip_members 
+                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
                 ADD CONSTRAINT trip_members_trip_id_fkey 
-                FOREIGN KEY (trip_id) REFERENCES trips(id) ON DELETE CASCADE
+                    FOREIGN KEY (trip_id) REFERENCES trips(id) ON DELETE CASCADE
             """))
             
             # Commit transaction
@@ -0,0 +1,58 @@
+"""
+Add composite indexes used by the admin dashboard to trip_members.
+
+`create_all` only creates missing tables, so databases created before these
+indexes were declared on the TripMember model need this migration:
+
+- ix_trip_payment_status (trip_id, payment_status): per-trip payment counts
+- ix_trip_joined (trip_id, joined_at): member list ordered by join date
+
+Indexes are built CONCURRENTLY so the table stays writable during the build.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import engine
+from sqlalchemy import text
+
+
+INDEXES = [
+    ("ix_trip_payment_status", "trip_id, payment_status"),
+    ("ix_trip_joined", "trip_id, joined_at"),
+]
+
+
+def add_trip_member_indexes():
+    """Create the composite indexes if they do not exist yet."""
+    
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        print("🔄 Adding composite indexes to trip_members...")
+        
+        for name, columns in INDEXES:
+            try:
+                print(f"   Creating {name} ({columns})...")
+                conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON trip_members ({columns})"
+                ))
+            except Exception as e:
+                print(f"❌ Failed to create {name}: {e}")
+                raise
+        
+        conn.execute(text("ANALYZE trip_members"))
+        print("✅ Composite indexes are in place!")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Database Migration: Add trip_members Composite Indexes")
+    print("=" * 60)
+    
+    response = input("\n⚠️  This will modify the database schema. Continue? (yes/no): ")
+    
+    if response.lower() in ['yes', 'y']:
+        add_trip_member_indexes()
+    else:
+        print("\n❌ Migration cancelled.")
@@ -9,6 +9,8 @@ import logging
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import select
+
 from bot import bot
 from database import get_db
 from models.User import User
@@ -20,50 +22,85 @@ logging.basicConfig(
 )
 
 
+MESSAGE = (
+    "⚠️ <b>Attention</b> ⚠️\n\n"
+    "Some users are stopping right after registering with Google — but that's not the end! "
+    "To officially join the trip, please follow these steps:\n"
+    "1️⃣ Send /trips command to see the list of available trips;\n"
+    "2️⃣ Choose the trip you want to join;\n"
+    "3️⃣ Read the agreement carefully and press \"I agree\";\n"
+    "4️⃣ Send a screenshot of your payment receipt (at least half of the total) to reserve your seat.\n\n"
+    "💙 After completing these steps, your seat will be confirmed!"
+)
+
+# Stream users from the database in batches of this size
+BATCH_SIZE = 500
+
+# Telegram allows roughly 30 messages per second per bot; overlap network IO
+# up to MAX_CONCURRENT sends while pacing message starts to MESSAGES_PER_SECOND.
+MAX_CONCURRENT = 25
+MESSAGES_PER_SECOND = 30
+
+
+class RateLimiter:
+    """Space out calls so at most `rate` start per second."""
+    
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
 async def send_broadcast():
     """Send broadcast message to all users."""
     
     print("🚀 Starting broadcast...")
     
-    message = (
-        "⚠️ <b>Attention</b> ⚠️\n\n"
-        "Some users are stopping right after registering with Google — but that's not the end! "
-        "To officially join the trip, please follow these steps:\n"
-        "1️⃣ Send /trips command to see the list of available trips;\n"
-        "2️⃣ Choose the trip you want to join;\n"
-        "3️⃣ Read the agreement carefully and press \"I agree\";\n"
-        "4️⃣ Send a screenshot of your payment receipt (at least half of the total) to reserve your seat.\n\n"
-        "💙 After completing these steps, your seat will be confirmed!"
-    )
-    
     # Get all users from database
     db_gen = get_db()
     db = next(db_gen)
     
     try:
-        users = db.query(User).all()
-        total_users = len(users)
-        success_count = 0
-        fail_count = 0
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+        limiter = RateLimiter(MESSAGES_PER_SECOND)
         
-        logging.info(f"Found {total_users} users to send message to")
+        async def send_one(telegram_id, first_name, last_name) -> bool:
+            async with semaphore:
+                await limiter.wait()
+                try:
+                    await bot.send_message(
+                        telegram_id,
+                        MESSAGE,
+                        parse_mode='HTML'
+                    )
+                    logging.info(f"✅ Sent to user {telegram_id} ({first_name} {last_name})")
+                    return True
+                except Exception as e:
+                    logging.error(f"❌ Failed to send to user {telegram_id}: {e}")
+                    return False
         
-        for user in users:
-            try:
-                await bot.send_message(
-                    user.telegram_id,
-                    message,
-                    parse_mode='HTML'
-                )
-                success_count += 1
-                logging.info(f"✅ Sent to user {user.telegram_id} ({user.first_name} {user.last_name})")
-                
-                # Small delay to avoid rate limiting
-                await asyncio.sleep(0.05)
-                
-            except Exception as e:
-                fail_count += 1
-                logging.error(f"❌ Failed to send to user {user.telegram_id}: {e}")
+        # Only the columns needed for sending, streamed in batches so sending starts
+        # right away and memory stays flat regardless of the number of users
+        result = db.execute(
+            select(User.telegram_id, User.first_name, User.last_name)
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+        total_users = 0
+        success_count = 0
+        for batch in result.partitions():
+            total_users += len(batch)
+            results = await asyncio.gather(*(send_one(*row) for row in batch))
+            success_count += sum(results)
+        fail_count = total_users - success_count
         
         logging.info(f"\n📊 Broadcast complete!")
         logging.info(f"Total users: {total_users}")
@@ -10,41 +10,33 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from database import SessionLocal, engine
+from database import SessionLocal
 from models.Trip import Trip
-from sqlalchemy import text
+from sqlalchemy import update
 
 def fix_null_prices():
     """Update all trips with NULL price to 0."""
     session = SessionLocal()
     
     try:
-        print("🔍 Checking for trips with NULL price...")
+        print("🔧 Updating NULL prices to 0...")
         
-        # Check for NULL prices
-        trips_with_null = session.query(Trip).filter(Trip.price == None).all()
+        # Single UPDATE ... RETURNING reports exactly which trips changed
+        rows = session.execute(
+            update(Trip)
+            .where(Trip.price.is_(None))
+            .values(price=0)
+            .returning(Trip.id, Trip.name)
+        ).all()
+        session.commit()
         
-        if not trips_with_null:
+        if not rows:
             print("✅ No trips with NULL price found. All good!")
             return
         
-        print(f"⚠️  Found {len(trips_with_null)} trips with NULL price:")
-        for trip in trips_with_null:
-            print(f"   - ID: {trip.id}, Name: {trip.name}, Price: {trip.price}")
-        
-        # Fix NULL prices
-        print("\n🔧 Updating NULL prices to 0...")
-        count = session.query(Trip).filter(Trip.price == None).update({Trip.price: 0})
-        session.commit()
-        
-        print(f"✅ Updated {count} trips")
-        
-        # Verify
-        remaining = session.query(Trip).filter(Trip.price == None).count()
-        if remaining > 0:
-            print(f"⚠️  Warning: {remaining} trips still have NULL price")
-        else:
-            print("✅ All trips now have valid prices")
+        print(f"✅ Updated {len(rows)} trips:")
+        for trip_id, name in rows:
+            print(f"   - ID: {trip_id}, Name: {name}")
         
     except Exception as e:
         print(f"❌ Error: {e}")
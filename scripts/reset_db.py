@@ -12,8 +12,11 @@ from utils.logging_config import setup_logging
 
 if __name__ == '__main__':
     setup_logging()
-    logging.info('db.reset dropping tables')
-    Base.metadata.drop_all(bind=engine)
-    logging.info('db.reset creating tables')
-    Base.metadata.create_all(bind=engine)
+    # One connection and one transaction for the whole reset: PostgreSQL DDL is
+    # transactional, so a failure part-way leaves the old schema untouched
+    with engine.begin() as conn:
+        logging.info('db.reset dropping tables')
+        Base.metadata.drop_all(bind=conn)
+        logging.info('db.reset creating tables')
+        Base.metadata.create_all(bind=conn)
     logging.info('db.reset complete')
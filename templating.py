@@ -0,0 +1,74 @@
+"""Shared Jinja2 templates instance.
+
+All routers render through one `Environment` so compiled templates are cached
+once per process instead of once per module. Compiled bytecode is also stored
+on disk so new workers skip re-parsing the templates, and every template is
+compiled at import so the first request does not pay for it.
+"""
+
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from pathlib import Path
+import logging
+import os
+
+from utils.http_cache import etag_response, make_etag
+
+BASE_DIR = Path(__file__).resolve().parent
+TEMPLATES_DIR = BASE_DIR / "templates"
+
+# Re-check template files for changes on every render (set TEMPLATE_AUTO_RELOAD=true for local development)
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() in ("true", "1", "yes")
+
+
+def _bytecode_cache():
+    """Return an on-disk bytecode cache, or None if no safe cache dir is available.
+
+    Without a directory argument Jinja uses a per-user 0700 temp dir and refuses
+    one owned by someone else, so other local users cannot plant bytecode.
+    """
+    try:
+        return FileSystemBytecodeCache()
+    except (OSError, RuntimeError) as e:
+        logging.warning("templating.bytecode_cache disabled err=%s", e)
+        return None
+
+
+env = Environment(
+    loader=FileSystemLoader(str(TEMPLATES_DIR)),
+    autoescape=True,
+    bytecode_cache=_bytecode_cache(),
+    auto_reload=TEMPLATE_AUTO_RELOAD,
+    cache_size=400,
+)
+
+templates = Jinja2Templates(env=env)
+
+
+def preload_templates() -> int:
+    """Parse and compile every HTML template so requests only pay for rendering."""
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+preload_templates()
+
+
+class StaticPage:
+    """A context-free template rendered once and served with an ETag."""
+
+    def __init__(self, name: str):
+        self.body = env.get_template(name).render().encode("utf-8")
+        self.etag = make_etag(self.body)
+
+    def response(self, request: Request) -> Response:
+        """Return the pre-rendered page, or 304 if the client already has it."""
+        return etag_response(request, self.body, "public, max-age=3600", etag=self.etag)
+
+
+HOME_PAGE = StaticPage("home.html")
+PRIVACY_PAGE = StaticPage("privacy.html")
@@ -0,0 +1,43 @@
+"""Admin dashboard cache must not hide trips created through the trips API."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+_DB_FILE = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_FILE}"
+os.environ["BYPASS_TELEGRAM_CHECK"] = "true"
+
+from fastapi.testclient import TestClient
+
+import main
+from database import Base, engine
+
+
+class DashboardCacheTest(unittest.TestCase):
+    def setUp(self):
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        # TestClient without a context manager skips the webhook startup hook
+        self.client = TestClient(main.app)
+
+    def test_created_trip_is_listed_on_dashboard(self):
+        # Warm the dashboard cache before the trip exists
+        self.assertEqual(self.client.get("/admin").status_code, 200)
+
+        with patch("routers.trips.bot.create_chat_invite_link", new=AsyncMock(side_effect=RuntimeError("offline"))):
+            response = self.client.post(
+                "/api/trips/create",
+                json={"name": "Samarkand Weekend", "group_id": -1001, "price": 100000},
+            )
+        self.assertEqual(response.status_code, 200)
+
+        dashboard = self.client.get("/admin")
+        self.assertEqual(dashboard.status_code, 200)
+        self.assertIn("Samarkand Weekend", dashboard.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
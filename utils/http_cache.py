@@ -0,0 +1,66 @@
+"""In-process response caching helpers.
+
+`TTLCache` holds short-lived results keyed per route; `etag_response` serves a
+body with an ETag and answers a matching If-None-Match with an empty 304.
+"""
+
+from typing import Any, Hashable, Optional
+import hashlib
+import time
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+class TTLCache:
+    """Dict cache whose entries expire `ttl` seconds after they are stored.
+
+    When `max_entries` is reached the whole cache is dropped; entries are cheap
+    to rebuild and this keeps the bookkeeping to a single dict.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def make_etag(body: bytes, weak: bool = False) -> str:
+    """Return a quoted MD5 ETag for `body` (W/-prefixed when weak)."""
+    tag = f'"{hashlib.md5(body).hexdigest()}"'
+    return f"W/{tag}" if weak else tag
+
+
+def etag_response(
+    request: Request,
+    body: bytes,
+    cache_control: str,
+    media_type: str = "text/html",
+    etag: Optional[str] = None,
+) -> Response:
+    """Serve `body` with ETag and Cache-Control headers, or 304 if the client has it.
+
+    Pass a precomputed `etag` when the body is cached; otherwise a strong one is
+    derived from the body.
+    """
+    if etag is None:
+        etag = make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
@@ -0,0 +1,19 @@
+"""Shared async HTTP client for outbound API calls.
+
+A single `httpx.AsyncClient` keeps TCP/TLS connections pooled across requests
+instead of opening a new connection per call.
+"""
+
+import httpx
+
+# Shared by the Telegram setup calls and Google OAuth; keep-alive connections are
+# reused so repeated calls skip the TCP/TLS handshake.
+http_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(10.0),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+)
+
+
+async def close_http_client() -> None:
+    """Close pooled connections; call on application shutdown."""
+    await http_client.aclose()
@@ -1,28 +1,73 @@
+import atexit
+import io
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
 
 DEFAULT_FORMAT = "%(asctime)s %(levelname).1s %(name)s - %(message)s"
 DEFAULT_DATEFMT = "%Y-%m-%d %H:%M:%S"
 
 _configured = False
+_listener = None
+_lock = threading.Lock()
+
+
+class _BatchingStreamHandler(logging.StreamHandler):
+    """StreamHandler that flushes only once the log queue has drained.
+
+    Bursts of records are coalesced in the stream buffer and written with one
+    syscall; an idle queue still flushes right away so logs are never held back.
+    """
+
+    def __init__(self, stream, log_queue):
+        super().__init__(stream)
+        self._queue = log_queue
+
+    def flush(self) -> None:
+        if self._queue.empty():
+            super().flush()
+
+
+def _buffered_stdout():
+    """Return a 64 KiB buffered text stream over stdout (plain stdout if unavailable)."""
+    try:
+        raw = io.BufferedWriter(sys.stdout.buffer, buffer_size=65536)
+    except AttributeError:
+        return sys.stdout
+    return io.TextIOWrapper(raw, encoding="utf-8", line_buffering=False, write_through=False)
+
 
 def setup_logging(level: int = logging.INFO) -> None:
-    global _configured
+    global _configured, _listener
     if _configured:
         return
-    handler = logging.StreamHandler(stream=sys.stdout)
-    formatter = logging.Formatter(fmt=DEFAULT_FORMAT, datefmt=DEFAULT_DATEFMT)
-    handler.setFormatter(formatter)
-
-    root = logging.getLogger()
-    # Remove existing handlers to avoid duplicate logs when reloading
-    for h in list(root.handlers):
-        root.removeHandler(h)
-    root.addHandler(handler)
-    root.setLevel(level)
-
-    # Quiet noisy third-party loggers if needed
-    logging.getLogger("urllib3").setLevel(logging.WARNING)
-    logging.getLogger("telebot").setLevel(logging.INFO)
-
-    _configured = True
+    # Double-checked so concurrent callers cannot start a second listener
+    with _lock:
+        if _configured:
+            return
+        # Request code only enqueues records; a background thread formats and writes them
+        log_queue = queue.SimpleQueue()
+        handler = _BatchingStreamHandler(_buffered_stdout(), log_queue)
+        formatter = logging.Formatter(fmt=DEFAULT_FORMAT, datefmt=DEFAULT_DATEFMT)
+        handler.setFormatter(formatter)
+
+        _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        # Drain pending records and flush the buffer on interpreter shutdown
+        atexit.register(logging.StreamHandler.flush, handler)
+        atexit.register(_listener.stop)
+
+        root = logging.getLogger()
+        # Remove existing handlers to avoid duplicate logs when reloading
+        for h in list(root.handlers):
+            root.removeHandler(h)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(level)
+
+        # Quiet noisy third-party loggers if needed
+        logging.getLogger("urllib3").setLevel(logging.WARNING)
+        logging.getLogger("telebot").setLevel(logging.INFO)
+
+        _configured = True
@@ -1,5 +1,21 @@
 """Utility functions for text formatting."""
 
+import re
+import unicodedata
+
+# Letters that str.title() capitalized after something other than a space,
+# hyphen or apostrophe (digits, dots, ...); these are lowered back
+_EXTRA_TITLE_WORD = re.compile(r"(?<=[^\w\s\-']|[\d_])([^\W\d_]+)")
+
+
+def _lower_match(match: re.Match) -> str:
+    return match.group(1).lower()
+
+
+# ASCII fast path: same rules on bytes, where casing needs no Unicode lookups
+_ASCII_SEPARATORS = b" -'"
+_ASCII_EXTRA_TITLE_WORD = re.compile(rb"(?<=[^A-Za-z\s\-'])([A-Za-z]+)")
+
 
 def format_name(name: str) -> str:
     """Format a name with proper capitalization.
@@ -26,31 +42,25 @@ def format_name(name: str) -> str:
     if not name:
         return ""
     
-    # Split by spaces and format each word
-    words = name.strip().split()
-    formatted_words = []
+    if name.isascii():
+        formatted_bytes = b" ".join(name.encode("ascii").split()).title()
+        if not formatted_bytes.translate(None, _ASCII_SEPARATORS).isalpha():
+            formatted_bytes = _ASCII_EXTRA_TITLE_WORD.sub(_lower_match, formatted_bytes)
+        return formatted_bytes.decode("ascii")
     
-    for word in words:
-        if not word:
-            continue
-            
-        # Handle hyphenated names (e.g., Jean-Claude)
-        if '-' in word:
-            parts = word.split('-')
-            formatted_parts = [part.capitalize() for part in parts if part]
-            formatted_words.append('-'.join(formatted_parts))
-        
-        # Handle apostrophes (e.g., O'Brien, D'Angelo)
-        elif "'" in word:
-            parts = word.split("'")
-            formatted_parts = [part.capitalize() for part in parts if part]
-            formatted_words.append("'".join(formatted_parts))
-        
-        else:
-            # Standard capitalization
-            formatted_words.append(word.capitalize())
+    # Normalize composition (NFC vs NFD, compatibility forms) so identical-looking
+    # names format identically; the quick check skips the copy for normalized input
+    if not unicodedata.is_normalized("NFKC", name):
+        name = unicodedata.normalize("NFKC", name)
+    
+    # Collapse whitespace and capitalize in C; str.title() already starts a new
+    # word after spaces, hyphens and apostrophes
+    formatted = " ".join(name.split()).title()
     
-    return ' '.join(formatted_words)
+    # Only names containing other separators need the regex fixup
+    if formatted.replace(" ", "").replace("-", "").replace("'", "").isalpha():
+        return formatted
+    return _EXTRA_TITLE_WORD.sub(_lower_match, formatted)
 
 
 def format_full_name(first_name: str, last_name: str) -> tuple[str, str]:
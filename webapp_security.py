@@ -2,24 +2,58 @@
 
 from fastapi import Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from pathlib import Path
 import hashlib
 import hmac
-from urllib.parse import unquote, parse_qsl
+from urllib.parse import unquote, unquote_plus, parse_qsl
 from typing import Optional
+from functools import lru_cache
 import logging
 import os
+import re
 
 from config import Config
+from templating import templates
 
-# Setup templates
-BASE_DIR = Path(__file__).resolve().parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+logger = logging.getLogger(__name__)
 
 # Allow bypassing Telegram check in development (set BYPASS_TELEGRAM_CHECK=true in .env)
 BYPASS_TELEGRAM_CHECK = os.getenv("BYPASS_TELEGRAM_CHECK", "false").lower() in ("true", "1", "yes")
 
+# Block non-Telegram access (default: true for production security; set STRICT_TELEGRAM_CHECK=false to disable)
+STRICT_TELEGRAM_CHECK = os.getenv("STRICT_TELEGRAM_CHECK", "true").lower() in ("true", "1", "yes")
+
+_BOT_TOKEN = Config.BOT_TOKEN
+_BOT_USERNAME = getattr(Config, 'BOT_USERNAME', None)
+
+# Request fingerprints used by is_telegram_webapp_request (case-insensitive regexes avoid
+# building lowercased copies of the headers on every request)
+_TELEGRAM_UA_RE = re.compile(r"telegram", re.IGNORECASE)
+_TELEGRAM_REFERER_RE = re.compile(r"telegram|t\.me", re.IGNORECASE)
+_TELEGRAM_QUERY_PARAMS = frozenset(("tgWebAppStartParam", "tgWebAppThemeParams"))
+_EMBEDDED_FETCH_DEST = frozenset(("iframe", "embed", "document"))
+
+
+@lru_cache(maxsize=4)
+def _webapp_secret(bot_token: str) -> bytes:
+    """Derive the initData signing key; constant per bot token, so computed once."""
+    return hmac.new(
+        key=b"WebAppData",
+        msg=bot_token.encode(),
+        digestmod=hashlib.sha256
+    ).digest()
+
+
+@lru_cache(maxsize=4)
+def _warm_hmac(bot_token: str) -> hmac.HMAC:
+    """Keyed HMAC with the pads already absorbed; callers .copy() it per message."""
+    return hmac.new(_webapp_secret(bot_token), None, hashlib.sha256)
+
+
+@lru_cache(maxsize=8)
+def _rejection_body(bot_username: Optional[str]) -> str:
+    """Render the 403 page once per bot username; the template uses no other context."""
+    return templates.get_template("webapp_only.html").render(bot_username=bot_username)
+
 
 def validate_telegram_webapp_data(init_data: str, bot_token: str) -> bool:
     """Validate Telegram WebApp initData using the bot token.
@@ -32,40 +66,69 @@ def validate_telegram_webapp_data(init_data: str, bot_token: str) -> bool:
         True if valid, False otherwise
     """
     try:
-        # Parse the init_data query string
-        parsed_data = dict(parse_qsl(init_data))
-        
-        # Extract the hash
-        received_hash = parsed_data.pop('hash', None)
+        # Single pass over the query string: pull out the hash, URL-decode the
+        # other fields (same rules as parse_qsl: '+' is a space, blank values dropped)
+        received_hash = None
+        fields = []
+        for pair in init_data.split('&'):
+            key, _, value = pair.partition('=')
+            if not value:
+                continue
+            key = unquote_plus(key)
+            if key == 'hash':
+                received_hash = unquote_plus(value)
+            else:
+                fields.append((key, unquote_plus(value)))
         if not received_hash:
             return False
         
-        # Create data check string (sorted key=value pairs)
-        data_check_arr = [f"{k}={v}" for k, v in sorted(parsed_data.items())]
-        data_check_string = '\n'.join(data_check_arr)
-        
-        # Create secret key from bot token
-        secret_key = hmac.new(
-            key=b"WebAppData",
-            msg=bot_token.encode(),
-            digestmod=hashlib.sha256
-        ).digest()
+        # Create data check string (key=value pairs sorted by key)
+        fields.sort()
+        data_check_string = '\n'.join([f"{k}={v}" for k, v in fields])
         
-        # Calculate hash
-        calculated_hash = hmac.new(
-            key=secret_key,
-            msg=data_check_string.encode(),
-            digestmod=hashlib.sha256
-        ).hexdigest()
+        # Calculate hash from a copy of the pre-keyed HMAC (cached per token)
+        mac = _warm_hmac(bot_token).copy()
+        mac.update(data_check_string.encode())
+        calculated_hash = mac.digest()
         
-        # Compare hashes
-        return hmac.compare_digest(calculated_hash, received_hash)
+        # Compare raw digests rather than their hex encodings
+        try:
+            received_digest = bytes.fromhex(received_hash)
+        except ValueError:
+            return False
+        return hmac.compare_digest(calculated_hash, received_digest)
     
     except Exception as e:
-        logging.error(f"Error validating Telegram WebApp data: {e}")
+        logger.error("Error validating Telegram WebApp data: %s", e)
         return False
 
 
+def _raw_init_data(request: Request) -> Optional[str]:
+    """Return the raw initData string from the query string or header, if any."""
+    return request.query_params.get('tgWebAppData') or request.headers.get('X-Telegram-Init-Data')
+
+
+def _get_init_data(request: Request) -> dict:
+    """Parse initData once per request and cache it on request.state."""
+    parsed = getattr(request.state, 'tg_init_data', None)
+    if parsed is not None:
+        return parsed
+    raw = _raw_init_data(request)
+    parsed = dict(parse_qsl(raw)) if raw else {}
+    request.state.tg_init_data = parsed
+    return parsed
+
+
+def _init_data_valid(request: Request) -> bool:
+    """Validate the request's initData signature once and cache the result on request.state."""
+    valid = getattr(request.state, 'tg_init_valid', None)
+    if valid is None:
+        raw = _raw_init_data(request)
+        valid = bool(raw and _BOT_TOKEN) and validate_telegram_webapp_data(raw, _BOT_TOKEN)
+        request.state.tg_init_valid = valid
+    return valid
+
+
 def is_telegram_webapp_request(request: Request) -> bool:
     """Check if the request comes from Telegram WebApp.
     
@@ -82,63 +145,58 @@ def is_telegram_webapp_request(request: Request) -> bool:
         True if request appears to be from Telegram WebApp
     """
     # Check 1: Look for Telegram WebApp specific headers
-    user_agent = request.headers.get('user-agent', '').lower()
-    if 'telegram' in user_agent:
-        logging.debug("Telegram detected via user-agent")
+    headers = request.headers
+    user_agent = headers.get('user-agent', '')
+    if _TELEGRAM_UA_RE.search(user_agent):
+        logger.debug("Telegram detected via user-agent")
         return True
     
     # Check 2: Look for initData parameter (passed by Telegram WebApp)
-    init_data = request.query_params.get('tgWebAppData') or request.headers.get('X-Telegram-Init-Data')
-    if init_data:
-        logging.debug("Telegram detected via initData")
-        # Optionally validate the initData signature
-        if Config.BOT_TOKEN:
-            is_valid = validate_telegram_webapp_data(init_data, Config.BOT_TOKEN)
-            if is_valid:
-                logging.debug("initData validation successful")
-                return True
+    if _raw_init_data(request):
+        logger.debug("Telegram detected via initData")
+        # The signature check only feeds this debug line, so skip the HMAC unless it is logged
+        if logger.isEnabledFor(logging.DEBUG) and _BOT_TOKEN and _init_data_valid(request):
+            logger.debug("initData validation successful")
         return True
     
     # Check 3: Look for Telegram WebApp version header
-    webapp_version = request.headers.get('X-Telegram-WebApp-Version')
+    webapp_version = headers.get('X-Telegram-WebApp-Version')
     if webapp_version:
-        logging.debug("Telegram detected via WebApp version header")
+        logger.debug("Telegram detected via WebApp version header")
         return True
     
     # Check 4: Check for specific query parameters that indicate Telegram context
-    telegram_params = ['tgWebAppStartParam', 'tgWebAppThemeParams']
-    if any(param in request.query_params for param in telegram_params):
-        logging.debug("Telegram detected via query params")
+    if not _TELEGRAM_QUERY_PARAMS.isdisjoint(request.query_params.keys()):
+        logger.debug("Telegram detected via query params")
         return True
     
     # Check 5: Check Referer header
-    referer = request.headers.get('referer', '')
-    if 'telegram' in referer.lower() or 't.me' in referer.lower():
-        logging.debug("Telegram detected via referer")
+    if _TELEGRAM_REFERER_RE.search(headers.get('referer', '')):
+        logger.debug("Telegram detected via referer")
         return True
     
     # Check 6: WebView characteristics (iOS/Android WebView used by Telegram)
     # Telegram uses custom WebViews that have specific characteristics
+    user_agent = user_agent.lower()
     if 'mobile' in user_agent and 'safari' not in user_agent and 'chrome' not in user_agent:
         # Likely a WebView (not a full browser)
-        logging.debug("Possible Telegram WebView detected (mobile without full browser)")
+        logger.debug("Possible Telegram WebView detected (mobile without full browser)")
         return True
     
     # Check 7: Accept headers that indicate embedded context
-    sec_fetch_dest = request.headers.get('sec-fetch-dest', '').lower()
-    if sec_fetch_dest in ('iframe', 'embed', 'document'):
+    if headers.get('sec-fetch-dest', '').lower() in _EMBEDDED_FETCH_DEST:
         # Likely embedded in an iframe or WebView
-        logging.debug("Embedded context detected via sec-fetch-dest")
+        logger.debug("Embedded context detected via sec-fetch-dest")
         return True
     
     # Check 8: For now, allow all requests to /webapp/* routes by default
     # This is more permissive but prevents blocking legitimate Telegram WebApp users
     # The real security comes from the Telegram initData validation on the client side
-    if request.url.path.startswith('/webapp/') or request.url.path.startswith('/admin'):
-        logging.debug("WebApp route detected - allowing access (security handled by client-side Telegram.WebApp)")
+    if request.url.path.startswith(('/webapp/', '/admin')):
+        logger.debug("WebApp route detected - allowing access (security handled by client-side Telegram.WebApp)")
         return True
     
-    logging.debug("No Telegram indicators found")
+    logger.debug("No Telegram indicators found")
     return False
 
 
@@ -164,32 +222,26 @@ def require_telegram_webapp(request: Request, bot_username: Optional[str] = None
     """
     # Allow bypassing check in development mode
     if BYPASS_TELEGRAM_CHECK:
-        logging.debug("Telegram WebApp check bypassed (development mode)")
+        logger.debug("Telegram WebApp check bypassed (development mode)")
         return None
     
-    # Check if strict mode is enabled (default: true for production security)
-    strict_mode = os.getenv("STRICT_TELEGRAM_CHECK", "true").lower() in ("true", "1", "yes")
-    
-    if strict_mode and not is_telegram_webapp_request(request):
-        logging.warning(
-            f"Non-Telegram access attempt to {request.url.path} from "
-            f"user-agent: {request.headers.get('user-agent', 'unknown')}"
-        )
-        return templates.TemplateResponse(
-            "webapp_only.html",
-            {
-                "request": request,
-                "bot_username": bot_username or Config.BOT_USERNAME if hasattr(Config, 'BOT_USERNAME') else None
-            },
-            status_code=403
-        )
+    # In non-strict mode, we allow access; detection only runs when its log line would be emitted
+    if not STRICT_TELEGRAM_CHECK:
+        if logger.isEnabledFor(logging.INFO) and not is_telegram_webapp_request(request):
+            logger.info(
+                "WebApp access without Telegram indicators: %s (user-agent: %s)",
+                request.url.path,
+                request.headers.get('user-agent', 'unknown')[:50],
+            )
+        return None
     
-    # In non-strict mode, we allow access but log for monitoring
     if not is_telegram_webapp_request(request):
-        logging.info(
-            f"WebApp access without Telegram indicators: {request.url.path} "
-            f"(user-agent: {request.headers.get('user-agent', 'unknown')[:50]})"
+        logger.warning(
+            "Non-Telegram access attempt to %s from user-agent: %s",
+            request.url.path,
+            request.headers.get('user-agent', 'unknown'),
         )
+        return HTMLResponse(_rejection_body(bot_username or _BOT_USERNAME), status_code=403)
     
     return None
 
@@ -204,18 +256,13 @@ def get_telegram_user_id(request: Request) -> Optional[int]:
         Telegram user ID if found, None otherwise
     """
     try:
-        init_data = request.query_params.get('tgWebAppData') or request.headers.get('X-Telegram-Init-Data')
-        if not init_data:
-            return None
-        
-        parsed_data = dict(parse_qsl(init_data))
-        user_json = parsed_data.get('user')
+        user_json = _get_init_data(request).get('user')
         if user_json:
             import json
             user_data = json.loads(unquote(user_json))
             return user_data.get('id')
     
     except Exception as e:
-        logging.error(f"Error extracting Telegram user ID: {e}")
+        logger.error("Error extracting Telegram user ID: %s", e)
     
     return None